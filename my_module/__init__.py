@@ -0,0 +1 @@
+"""NBA Superteam Builder."""
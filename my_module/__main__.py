@@ -0,0 +1,5 @@
+"""Run a batch of Superteam scenarios, see my_module.batch."""
+
+from .batch import main
+
+main()
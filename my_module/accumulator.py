@@ -0,0 +1,326 @@
+"""Functions for summarizing simulated games without keeping every score.
+
+A SimulationAccumulator takes games one at a time (e.g. from Team.points())
+or in batches (e.g. from Team.simulate()) and keeps only running totals:
+the count, mean and variance of points, opponent points and margin
+(Welford's method), win, tie and loss counts, and histograms of one bin per
+point. Scores are whole numbers, so the histograms give the same
+percentiles as numpy.percentile of every score while their size stays
+fixed. Accumulators merge, so parallel workers can each fill one and send
+it back to be combined.
+"""
+
+import numpy as np
+
+from .functions import CHUNK_GAMES, SIM_PERCENTILES
+
+#Range of team points and of margins kept in a histogram bin per point,
+#scores outside are counted in the nearest edge bin
+POINTS_RANGE = (0, 512)
+MARGIN_RANGE = (-256, 256)
+
+
+class RunningStats():
+    """Class that stores the count, mean, variance, min and max of a stream of values
+
+    Batches and other RunningStats are combined with Chan et al.'s pairwise
+    update, so the result doesn't depend on how the stream was split up.
+    """
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        #Sum of squared differences from the mean
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def add(self, value):
+        """Add one value with Welford's update
+
+        Parameters
+        ----------
+        value : float
+            Value to add
+        """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def _combine(self, count, mean, m2, low, high):
+        """Combine the totals of another part of the stream"""
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, low)
+        self.max = max(self.max, high)
+
+    def update(self, values):
+        """Add an array of values
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            Values to add
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.size:
+            mean = float(values.mean())
+            self._combine(values.size, mean, float(np.square(values - mean).sum()),
+                          float(values.min()), float(values.max()))
+
+    def merge(self, other):
+        """Add every value another RunningStats has seen
+
+        Parameters
+        ----------
+        other : RunningStats
+            Stats of another part of the stream
+        """
+        self._combine(other.count, other.mean, other.m2, other.min, other.max)
+
+    @property
+    def variance(self):
+        """Sample variance of the values, nan for fewer than two values"""
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self):
+        """Sample standard deviation of the values"""
+        return float(np.sqrt(self.variance))
+
+
+class Histogram():
+    """Class that counts whole number values in one bin per value
+
+    Parameters
+    ----------
+    low : int
+        Smallest value with its own bin
+    high : int
+        One more than the largest value with its own bin
+    """
+    __slots__ = ('low', 'counts')
+
+    def __init__(self, low, high):
+        self.low = low
+        self.counts = np.zeros(high - low, dtype=np.int64)
+
+    def update(self, values):
+        """Count an array of values, truncated to whole numbers
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            Values to count
+        """
+        values = np.asarray(values)
+        if values.dtype.kind != 'i':
+            values = values.astype(np.int64)
+        bins = np.clip(values - self.low, 0, len(self.counts) - 1)
+        self.counts += np.bincount(bins.ravel(), minlength=len(self.counts))
+
+    def merge(self, other):
+        """Add the counts of another Histogram with the same range"""
+        if other.low != self.low or len(other.counts) != len(self.counts):
+            raise ValueError('histograms must have the same range to merge')
+        self.counts += other.counts
+
+    def percentiles(self, percentiles=SIM_PERCENTILES):
+        """Return percentiles the same way numpy.percentile would of the counted values
+
+        Parameters
+        ----------
+        percentiles : tuple, Optional
+            Percentiles to report, default=SIM_PERCENTILES
+
+        Return
+        ------
+        values : dict
+            Dictionary of percentile to value, empty when nothing was counted
+        """
+        total = int(self.counts.sum())
+        if total == 0:
+            return {}
+        cumulative = np.cumsum(self.counts)
+        #Rank of each percentile among the sorted values, between two values
+        #it is interpolated linearly like numpy.percentile's default
+        rank = (total - 1) * np.asarray(percentiles, dtype=np.float64) / 100
+        below = np.floor(rank)
+        lower = np.searchsorted(cumulative, below, side='right') + self.low
+        upper = np.searchsorted(cumulative, np.minimum(below + 1, total - 1), side='right') + \
+            self.low
+        values = lower + (rank - below) * (upper - lower)
+        return dict(zip(percentiles, values.tolist()))
+
+
+class SimulationAccumulator():
+    """Class that summarizes simulated games in a fixed amount of memory
+
+    Parameters
+    ----------
+    points_range : tuple, Optional
+        (low, high) points with their own histogram bin, default=POINTS_RANGE
+    margin_range : tuple, Optional
+        (low, high) margins with their own histogram bin, default=MARGIN_RANGE
+    """
+    def __init__(self, points_range=POINTS_RANGE, margin_range=MARGIN_RANGE):
+        self.points = RunningStats()
+        self.opponent_points = RunningStats()
+        self.margin = RunningStats()
+        self.points_histogram = Histogram(*points_range)
+        self.margin_histogram = Histogram(*margin_range)
+        self.wins = 0
+        self.ties = 0
+        self.losses = 0
+
+    @property
+    def n_games(self):
+        """Number of games accumulated"""
+        return self.points.count
+
+    def add_game(self, points, opponent_points=None):
+        """Add one game, e.g. from Team.points()
+
+        Parameters
+        ----------
+        points : int
+            Team's points
+        opponent_points : int, Optional
+            Opponent's points, default=None for games without an opponent
+        """
+        self.points.add(points)
+        self.points_histogram.counts[min(max(int(points) - self.points_histogram.low, 0),
+                                         len(self.points_histogram.counts) - 1)] += 1
+        if opponent_points is not None:
+            margin = points - opponent_points
+            self.opponent_points.add(opponent_points)
+            self.margin.add(margin)
+            self.margin_histogram.counts[min(max(int(margin) - self.margin_histogram.low, 0),
+                                             len(self.margin_histogram.counts) - 1)] += 1
+            if margin > 0:
+                self.wins += 1
+            elif margin < 0:
+                self.losses += 1
+            else:
+                self.ties += 1
+
+    def update(self, points, opponent_points=None):
+        """Add a batch of games, e.g. the arrays from Team.simulate()
+
+        Parameters
+        ----------
+        points : numpy.ndarray
+            Team's points of each game
+        opponent_points : numpy.ndarray, Optional
+            Opponent's points of each game, default=None for games without
+            an opponent
+        """
+        self.points.update(points)
+        self.points_histogram.update(points)
+        if opponent_points is not None:
+            margin = np.asarray(points) - np.asarray(opponent_points)
+            self.opponent_points.update(opponent_points)
+            self.margin.update(margin)
+            self.margin_histogram.update(margin)
+            wins = int(np.count_nonzero(margin > 0))
+            ties = int(np.count_nonzero(margin == 0))
+            self.wins += wins
+            self.ties += ties
+            self.losses += margin.size - wins - ties
+
+    def merge(self, other):
+        """Add every game another accumulator has seen, e.g. one from a worker
+
+        Parameters
+        ----------
+        other : SimulationAccumulator
+            Accumulator with the same histogram ranges
+
+        Return
+        ------
+        self : SimulationAccumulator
+            This accumulator, so partial results can be merged in a chain
+        """
+        self.points.merge(other.points)
+        self.opponent_points.merge(other.opponent_points)
+        self.margin.merge(other.margin)
+        self.points_histogram.merge(other.points_histogram)
+        self.margin_histogram.merge(other.margin_histogram)
+        self.wins += other.wins
+        self.ties += other.ties
+        self.losses += other.losses
+        return self
+
+    def summary(self, percentiles=SIM_PERCENTILES):
+        """Return the same summaries Team.simulate() reports, without the arrays
+
+        Parameters
+        ----------
+        percentiles : tuple, Optional
+            Percentiles to report, default=SIM_PERCENTILES
+
+        Return
+        ------
+        results : dict
+            Dictionary with 'n_games', 'mean_points', 'std_points' and
+            'points_percentiles'. With opponent games it also has
+            'mean_opponent_points', 'win_prob', 'tie_prob', 'loss_prob',
+            'mean_margin', 'std_margin' and 'margin_percentiles'
+        """
+        results = {'n_games': self.n_games,
+                   'mean_points': self.points.mean,
+                   'std_points': self.points.std,
+                   'points_percentiles': self.points_histogram.percentiles(percentiles)}
+        if self.margin.count:
+            results['mean_opponent_points'] = self.opponent_points.mean
+            results['win_prob'] = self.wins / self.margin.count
+            results['tie_prob'] = self.ties / self.margin.count
+            results['loss_prob'] = self.losses / self.margin.count
+            results['mean_margin'] = self.margin.mean
+            results['std_margin'] = self.margin.std
+            results['margin_percentiles'] = self.margin_histogram.percentiles(percentiles)
+        return results
+
+
+def simulate_stream(team, n_games, opponent=None, rng=None, model='triangular',
+                    chunk_games=CHUNK_GAMES):
+    """Simulate any number of games in chunks, keeping only their summary
+
+    Parameters
+    ----------
+    team : Team
+        Team to simulate, usually a SuperTeam
+    n_games : int
+        Number of games to simulate
+    opponent : Team, Optional
+        Team to play against, default=None only simulates team
+    rng : numpy.random.Generator or int, Optional
+        Generator or seed for the draws, default=None uses fresh entropy
+    model : string, Optional
+        One of GAME_MODELS to draw points with, default='triangular'
+    chunk_games : int, Optional
+        Games simulated at a time, default=CHUNK_GAMES
+
+    Return
+    ------
+    accumulator : SimulationAccumulator
+        Accumulator of every game
+    """
+    if n_games < 1:
+        raise ValueError('n_games must be at least 1')
+    rng = np.random.default_rng(rng)
+    accumulator = SimulationAccumulator()
+    for start in range(0, n_games, chunk_games):
+        results = team.simulate(min(chunk_games, n_games - start), opponent, percentiles=(),
+                                rng=rng, model=model)
+        accumulator.update(results['points'], results.get('opponent_points'))
+    return accumulator
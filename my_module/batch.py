@@ -0,0 +1,154 @@
+"""Functions for running what-if scenarios from a JSONL file without the GUI.
+
+Every input line is a JSON object such as
+
+{"bal": "Balanced", "stat": "Rebounds", "name": "Bigs", "opponent": "Miami Heat",
+ "n_games": 10000}
+
+where bal, name, n_games and season are optional and bal is one of
+TEAM_TYPES. One JSON result line is
+written per scenario as soon as it finishes, tagged with the scenario's
+line number.
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from .functions import TEAM_TYPES, make_opponent, make_superteam
+from .league import play_matchup
+
+#Games simulated for scenarios that don't give n_games
+N_GAMES = 10000
+#Scenarios queued per worker, which bounds memory whatever the input size
+QUEUE_PER_WORKER = 4
+
+
+def run_scenario(task):
+    """Build and simulate one scenario and return its result line
+
+    Parameters
+    ----------
+    task : tuple
+        Tuple of line number, line of JSON, seed for the whole batch and
+        default number of games
+
+    Return
+    ------
+    result : dict
+        Dictionary with the 'line' number and either the scenario's teams and
+        round_robin style summary or an 'error'
+    """
+    line_number, line, seed, n_games = task
+    try:
+        scenario = json.loads(line)
+        if not isinstance(scenario, dict):
+            raise TypeError('scenario must be a JSON object')
+        season = scenario.get('season')
+        season = tuple(season) if isinstance(season, list) else season
+        bal = scenario.get('bal', 'Unbalanced')
+        if bal not in TEAM_TYPES:
+            raise ValueError('bal must be one of ' + str(list(TEAM_TYPES)))
+        games = scenario.get('n_games', n_games)
+        #JSON numbers can be floats up to infinity, and True would count as 1
+        if not isinstance(games, int) or isinstance(games, bool) or games < 1:
+            raise ValueError('n_games must be a whole number of at least 1')
+        team = make_superteam(bal, scenario['stat'], scenario.get('name', ''), season)
+        opponent = make_opponent(scenario['opponent'], scenario['stat'], season)
+        if not opponent.players:
+            raise ValueError('no players found for team: ' + scenario['opponent'])
+        #Each line gets the stream spawn() would give it, so results don't
+        #depend on the number of workers or the order scenarios finish in
+        stream = np.random.SeedSequence(seed, spawn_key=(line_number,))
+        summary = play_matchup(scenario['opponent'], team, opponent, games, stream)
+    except (KeyError, ValueError, TypeError) as error:
+        return {'line': line_number, 'error': type(error).__name__ + ': ' + str(error)}
+    return dict({'line': line_number, 'name': team.team, 'players': list(team.players)},
+                **summary)
+
+
+def run_batch(lines, output, workers=None, seed=None, n_games=N_GAMES):
+    """Run every scenario of a JSONL stream and write a result line for each
+
+    Parameters
+    ----------
+    lines : iterable
+        Lines of JSON, e.g. an open file, read one at a time
+    output : file
+        File the JSON result lines are written and flushed to
+    workers : int, Optional
+        Number of worker processes, default=None uses every core and 1 runs
+        every scenario in this process
+    seed : int, Optional
+        Seed for the whole batch, default=None uses fresh entropy
+    n_games : int, Optional
+        Games for scenarios that don't give n_games, default=N_GAMES
+
+    Return
+    ------
+    count : int
+        Number of scenarios run
+    """
+    #Every line shares one entropy so the batch can be rerun with the seed
+    seed = np.random.SeedSequence(seed).entropy
+    tasks = ((number, line, seed, n_games) for number, line in enumerate(lines, 1)
+             if line.strip())
+
+    def write(result):
+        output.write(json.dumps(result, ensure_ascii=False) + '\n')
+        output.flush()
+
+    count = 0
+    if workers == 1:
+        for task in tasks:
+            write(run_scenario(task))
+            count += 1
+        return count
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        limit = QUEUE_PER_WORKER * workers
+        pending = set()
+        for task in tasks:
+            pending.add(pool.submit(run_scenario, task))
+            if len(pending) >= limit:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    write(future.result())
+                    count += 1
+        for future in wait(pending).done:
+            write(future.result())
+            count += 1
+    return count
+
+
+def main(argv=None):
+    """Run a batch of scenarios from the command line"""
+    parser = argparse.ArgumentParser(
+        prog='python -m my_module',
+        description='Simulate Superteam scenarios from JSONL and stream one JSON result per line.')
+    parser.add_argument('input', nargs='?', default='-',
+                        help='JSONL file of scenarios, default reads stdin')
+    parser.add_argument('-o', '--output', default='-',
+                        help='file to write results to, default writes stdout')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes, default uses every core')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='seed for reproducible results')
+    parser.add_argument('--games', type=int, default=N_GAMES,
+                        help='games for scenarios without n_games, default ' + str(N_GAMES))
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        run_batch(source, output, args.workers, args.seed, args.games)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
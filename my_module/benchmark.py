@@ -0,0 +1,242 @@
+"""Functions for timing the data load, team selection, simulation and import.
+
+Run with
+
+python -m my_module.benchmark -o results.json
+python -m my_module.benchmark --compare results.json
+
+The second run exits with status 1 when any benchmark's median got slower
+than the saved one by more than the threshold.
+
+Benchmarks ending in _cold empty the aggregates or team caches before every
+round, so they time building what the others find cached.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from . import functions
+from .possession import simulate_possessions
+from .functions import STATS, NBA_TEAMS, TEAM_CACHE, SuperTeam, Team, data_changed, \
+    player_aggregates, top_5, top_5_balanced, top_5_weighted
+
+#Seconds each benchmark is repeated for, and fewest and most repeats
+MIN_TIME = 0.5
+MIN_ROUNDS = 3
+MAX_ROUNDS = 1000
+#Fraction a median can grow by before it counts as a regression
+THRESHOLD = 0.2
+
+
+class Case():
+    """Class that stores a benchmark's function and how it is timed
+
+    Parameters
+    ----------
+    run : function
+        Function that takes no arguments
+    setup : function, Optional
+        Function run before every call of run without being timed, e.g. to
+        empty caches, default=None
+    self_timed : bool, Optional
+        Whether run returns the seconds it measured itself instead of being
+        timed from outside, default=False
+    """
+    __slots__ = ('run', 'setup', 'self_timed')
+
+    def __init__(self, run, setup=None, self_timed=False):
+        self.run = run
+        self.setup = setup
+        self.self_timed = self_timed
+
+
+def _import_time():
+    """Return seconds importing my_module.functions takes in a fresh interpreter
+
+    -X importtime reports the import alone, leaving out interpreter startup.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import my_module.functions'],
+                            env=env, capture_output=True, text=True, check=True)
+    cumulative = [int(line.split('|')[1]) for line in result.stderr.splitlines()
+                  if line.endswith('| my_module.functions')]
+    return cumulative[0] / 1e6
+
+
+def _create_opponent():
+    """Run create_opponent for a Points team like the GUI does after create_team"""
+    functions.CHOSEN_STAT = 'Points'
+    functions.create_opponent(list(NBA_TEAMS)[0])
+
+
+def benchmarks():
+    """Return dictionary of benchmark names to Cases to time
+
+    Return
+    ------
+    cases : dict
+        Dictionary with keys of benchmark names and values of Case classes
+    """
+    team = SuperTeam(*top_5('PTS'))
+    opponent = Team(*top_5('PTS', 'LAL'))
+    latest = int(functions.get_data()['Season'].max())
+    rng = np.random.default_rng(0)
+    cases = {'import_cold': Case(_import_time, self_timed=True),
+             'csv_load': lambda: functions.parse_csv(functions.DATA_PATH),
+             'snapshot_load': lambda: functions.load_data(functions.DATA_PATH),
+             'build_aggregates': Case(player_aggregates, data_changed),
+             'build_aggregates_season': Case(lambda: player_aggregates(latest), data_changed),
+             'top_5_league': lambda: top_5('PTS'),
+             'top_5_team': lambda: top_5('PTS', 'LAL')}
+    for stat in STATS:
+        cases['top_5_balanced_' + stat] = lambda stat=stat: top_5_balanced(stat)
+    fantasy = np.random.default_rng(0).normal(size=(500, 6))
+    weightings = [dict(zip(('PTS', 'TRB', 'AST', 'STL', 'BLK', 'TOV'), weights))
+                  for weights in fantasy.tolist()]
+    cases['top_5_weighted_500'] = lambda: top_5_weighted(weightings)
+    #The same rankings with the aggregates they read built again every round
+    for name in [name for name in cases if name.startswith('top_5')]:
+        cases[name + '_cold'] = Case(cases[name], data_changed)
+    cases['create_team'] = lambda: functions.create_team('Balanced', 'Points', '')
+    cases['create_opponent'] = _create_opponent
+    #Teams built again every round from cached aggregates
+    cases['create_team_cold'] = Case(cases['create_team'], TEAM_CACHE.clear)
+    cases['create_opponent_cold'] = Case(_create_opponent, TEAM_CACHE.clear)
+    cases['simulate_1'] = lambda: team.simulate(1, opponent, rng=rng)
+    cases['simulate_10000'] = lambda: team.simulate(10000, opponent, rng=rng)
+    cases['simulate_1000000'] = lambda: team.simulate(1000000, opponent, rng=rng)
+    cases['simulate_possessions_100000'] = lambda: simulate_possessions(team, 100000, rng)
+    return {name: case if isinstance(case, Case) else Case(case) for name, case in cases.items()}
+
+
+def time_case(case, min_time=MIN_TIME):
+    """Return timings of a Case repeated for at least min_time seconds
+
+    Parameters
+    ----------
+    case : Case or function
+        Case to time, or a function that takes no arguments
+    min_time : float, Optional
+        Seconds to keep repeating for, default=MIN_TIME
+
+    Return
+    ------
+    timing : dict
+        Dictionary with 'rounds' and the 'min', 'median' and 'mean' seconds
+        of one call
+    """
+    if not isinstance(case, Case):
+        case = Case(case)
+    #Warm up caches and imports the same way repeated calls in an app would,
+    #cases with a setup empty the caches they time again every round
+    if case.setup is not None:
+        case.setup()
+    case.run()
+    times = []
+    start = time.perf_counter()
+    while len(times) < MIN_ROUNDS or \
+            (len(times) < MAX_ROUNDS and time.perf_counter() - start < min_time):
+        if case.setup is not None:
+            case.setup()
+        began = time.perf_counter()
+        seconds = case.run()
+        times.append(seconds if case.self_timed else time.perf_counter() - began)
+    return {'rounds': len(times), 'min': min(times), 'median': statistics.median(times),
+            'mean': statistics.fmean(times)}
+
+
+def run_benchmarks(names=None, min_time=MIN_TIME):
+    """Time every benchmark, or the ones named
+
+    Parameters
+    ----------
+    names : list, Optional
+        Names of benchmarks to run, default=None runs all of them
+    min_time : float, Optional
+        Seconds to repeat each benchmark for, default=MIN_TIME
+
+    Return
+    ------
+    results : dict
+        Dictionary with 'machine' details and 'benchmarks', a dictionary of
+        benchmark names to time_case() timings
+    """
+    cases = benchmarks()
+    unknown = [name for name in names or [] if name not in cases]
+    if unknown:
+        raise ValueError('unknown benchmarks: ' + str(unknown))
+    timings = {name: time_case(case, min_time) for name, case in cases.items()
+               if names is None or name in names}
+    return {'machine': {'python': platform.python_version(), 'numpy': np.__version__,
+                        'platform': platform.platform(), 'cpus': os.cpu_count()},
+            'benchmarks': timings}
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """Return the benchmarks whose median got slower than a baseline's
+
+    Parameters
+    ----------
+    results : dict
+        New run_benchmarks() results
+    baseline : dict
+        Saved run_benchmarks() results to compare with
+    threshold : float, Optional
+        Fraction a median can grow by before it is a regression,
+        default=THRESHOLD
+
+    Return
+    ------
+    regressions : dict
+        Dictionary with keys of benchmark names and values of the new median
+        divided by the baseline's, for benchmarks in both runs
+    """
+    regressions = {}
+    for name, timing in results['benchmarks'].items():
+        if name in baseline['benchmarks']:
+            ratio = timing['median'] / baseline['benchmarks'][name]['median']
+            if ratio > 1 + threshold:
+                regressions[name] = ratio
+    return regressions
+
+
+def main(argv=None):
+    """Run the benchmarks from the command line"""
+    parser = argparse.ArgumentParser(prog='python -m my_module.benchmark',
+                                     description='Time the Superteam builder.')
+    parser.add_argument('names', nargs='*', help='benchmarks to run, default runs all')
+    parser.add_argument('-o', '--output', help='file to save the JSON results to')
+    parser.add_argument('--compare', help='saved JSON results to flag regressions against')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='slowdown that counts as a regression, default ' + str(THRESHOLD))
+    parser.add_argument('--min-time', type=float, default=MIN_TIME,
+                        help='seconds to repeat each benchmark for, default ' + str(MIN_TIME))
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.names or None, args.min_time)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(results, output, indent=2)
+    for name, timing in results['benchmarks'].items():
+        print('{:<28} {:>12.6f} s median {:>12.6f} s min {:>6} rounds'.format(
+            name, timing['median'], timing['min'], timing['rounds']))
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as saved:
+            regressions = compare(results, json.load(saved), args.threshold)
+        for name, ratio in regressions.items():
+            print('REGRESSION {}: {:.2f}x the baseline median'.format(name, ratio))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""Functions for simulating correlated box scores of every player at once.
+
+Each player's PTS, AST, TRB, STL and BLK keep the triangular model of
+Team.points() and Team.stat() (their average +/- POINT_SPREAD or
+STAT_SPREAD, clamped at zero), but are drawn together through a Gaussian
+copula. The copula's correlation is estimated once from the dataset: the
+correlation of the five per game averages across rotation players, so
+games where a player scores more also tend to have more of the stats that
+go with scoring.
+"""
+
+import numpy as np
+
+from .functions import CHUNK_GAMES, POINT_SPREAD, STAT_SPREAD, STATS, SeasonCache, \
+    player_aggregates, season_bounds
+
+#Players averaging fewer minutes than this are left out of the correlation
+MIN_MINUTES = 10
+
+_MODELS = SeasonCache('box_score_model')
+
+
+def _normal_cdf(z):
+    """Return the standard normal cdf, with erf from Abramowitz and Stegun 7.1.26
+
+    Accurate to 1.5e-7, which is far below the resolution of a box score.
+    """
+    x = np.abs(z) * np.float32(1 / np.sqrt(2))
+    t = 1 / (1 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 +
+                                                     t * (-1.453152027 + t * 1.061405429))))
+    erf = 1 - poly * np.exp(-x * x)
+    return 0.5 * (1 + np.copysign(erf, z))
+
+
+def _triangular_ppf(u, lower, mode, upper):
+    """Return the inverse cdf of triangular distributions at probabilities u"""
+    width = upper - lower
+    #Probability of landing below the mode, 0 when the mode is at the lower bound
+    split = np.where(width > 0, (mode - lower) / np.where(width > 0, width, 1), 0)
+    rising = lower + np.sqrt(u * width * (mode - lower))
+    falling = upper - np.sqrt((1 - u) * width * (upper - mode))
+    return np.where(u < split, rising, falling)
+
+
+class BoxScoreModel():
+    """Class that stores every player's stat averages and the stat correlation
+
+    Parameters
+    ----------
+    aggregates : PlayerAggregates
+        Per-player averages the model is built from
+    """
+    def __init__(self, aggregates):
+        self.means = aggregates.means[list(STATS)].to_numpy(dtype=np.float64)
+        self.aggregates = aggregates
+        self.index = {plyr: row for row, plyr in enumerate(aggregates.means.index)}
+        rotation = aggregates.means['MP'].to_numpy() >= MIN_MINUTES
+        self.correlation = np.corrcoef(self.means[rotation].T)
+        self.cholesky = np.linalg.cholesky(self.correlation)
+        self.spreads = np.array([POINT_SPREAD if stat == 'PTS' else STAT_SPREAD
+                                 for stat in STATS], dtype=np.float64)
+
+    def player_ids(self, team):
+        """Return the player ids of a Team's players, see PlayerAggregates.team_ids
+
+        Parameters
+        ----------
+        team : Team
+            Team whose players are in the model's dataset
+
+        Return
+        ------
+        ids : list
+            List of player ids in the Team's order
+        """
+        return self.aggregates.team_ids(team)
+
+    def covariance(self, player_id):
+        """Return the 5 x 5 covariance of a player's simulated stats
+
+        Parameters
+        ----------
+        player_id : string
+            Player id, e.g. 'hardeja01'
+
+        Return
+        ------
+        covariance : numpy.ndarray
+            Covariance in STATS order, each stat's triangular standard
+            deviation scaled by the correlation
+        """
+        mode = self.means[self.index[player_id]]
+        lower = np.maximum(mode - self.spreads, 0)
+        upper = mode + self.spreads
+        #Variance of a triangular distribution
+        std = np.sqrt((lower ** 2 + mode ** 2 + upper ** 2 - lower * mode - lower * upper -
+                       mode * upper) / 18)
+        return self.correlation * np.outer(std, std)
+
+    def simulate(self, player_ids, n_games, rng=None):
+        """Simulate box scores of a lineup for many games in one pass
+
+        Parameters
+        ----------
+        player_ids : list
+            Player ids of the lineup
+        n_games : int
+            Number of games to simulate
+        rng : numpy.random.Generator or int, Optional
+            Generator or seed for the draws, default=None uses fresh entropy
+
+        Return
+        ------
+        box : numpy.ndarray
+            Structured array of shape (n_games, players) with a float32 field
+            for each of STATS
+        """
+        if n_games < 1:
+            raise ValueError('n_games must be at least 1')
+        rng = np.random.default_rng(rng)
+        mode = self.means[[self.index[plyr] for plyr in player_ids]].astype(np.float32)
+        lower = np.maximum(mode - self.spreads.astype(np.float32), 0)
+        upper = mode + self.spreads.astype(np.float32)
+        cholesky = self.cholesky.T.astype(np.float32)
+        box = np.empty((n_games, len(player_ids)), dtype=[(stat, np.float32) for stat in STATS])
+        #View the fields as one (games, players, stats) block to fill it directly
+        block = box.view(np.float32).reshape(n_games, len(player_ids), len(STATS))
+        for start in range(0, n_games, CHUNK_GAMES):
+            games = min(CHUNK_GAMES, n_games - start)
+            #float32 is plenty for box scores and halves the memory traffic
+            normals = rng.standard_normal((games, len(player_ids), len(STATS)), dtype=np.float32)
+            uniforms = _normal_cdf(normals @ cholesky)
+            block[start:start + games] = _triangular_ppf(uniforms, lower, mode, upper)
+        return box
+
+
+def box_score_model(season=None):
+    """Return the BoxScoreModel of the loaded dataset, rebuilt only when it changes
+
+    Parameters
+    ----------
+    season : int, tuple or range, Optional
+        Season or seasons to build the model from, default=None uses every
+        loaded season
+
+    Return
+    ------
+    model : BoxScoreModel
+        Cached model
+    """
+    aggregates = player_aggregates(season)
+    return _MODELS.get(season_bounds(season), aggregates.key,
+                       lambda: BoxScoreModel(aggregates))
+
+
+def simulate_box_scores(team, n_games, rng=None, season=None):
+    """Simulate PTS, AST, TRB, STL and BLK of all of a Team's players at once
+
+    Parameters
+    ----------
+    team : Team
+        Team to simulate, e.g. a SuperTeam or an opponent
+    n_games : int
+        Number of games to simulate
+    rng : numpy.random.Generator or int, Optional
+        Generator or seed for the draws, default=None uses fresh entropy
+    season : int, tuple or range, Optional
+        Season or seasons the players' averages come from, default=None
+        uses the seasons the Team was built from
+
+    Return
+    ------
+    box : numpy.ndarray
+        Structured array of shape (n_games, players) with a float32 field
+        for each of STATS
+    """
+    model = box_score_model(team.season if season is None else season)
+    return model.simulate(model.player_ids(team), n_games, rng)
+
+
+def box_totals(box):
+    """Return each game's team totals of a box score array
+
+    Parameters
+    ----------
+    box : numpy.ndarray
+        Structured array from simulate_box_scores()
+
+    Return
+    ------
+    totals : dict
+        Dictionary of stat to an int64 array of team totals per game,
+        truncated the same way Team.points() and Team.stat() are
+    """
+    return {stat: box[stat].sum(axis=1, dtype=np.float64).astype(np.int64) for stat in STATS}
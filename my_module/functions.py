@@ -1,107 +1,796 @@
 """A collection of function for doing my project."""
 
-import tkinter as tk
-import pandas as pd
+import copy
+import os
+import re
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
 import random as rd
 
-df = pd.read_csv('nbaplayers.csv')
+from .metrics import count, register_gauge, timed, timer
+
+#pandas and tkinter are imported where they are used, and the dataset is only
+#read the first time it is needed, so importing this module stays cheap
+
+#Path of the player dataset (a csv or a directory of per season csv files), can
+#be set with the NBA_PLAYERS_CSV environment variable or set_data_path(),
+#default is the csv next to my_module
+DATA_PATH = os.environ.get('NBA_PLAYERS_CSV',
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                        os.pardir, 'nbaplayers.csv'))
+#Binary snapshots of a csv are saved in a directory next to it with this suffix
+SNAPSHOT_SUFFIX = '.cache'
+#Bumped whenever the layout of a snapshot changes so old ones get rebuilt
+SNAPSHOT_FORMAT = 3
+#Season of a csv whose file name has no year in it, e.g. nbaplayers.csv
+DEFAULT_SEASON = 2020
+#Per season csv files have the season's year in their name
+SEASON_FILE = re.compile(r'(?<!\d)(\d{4})(?!\d)')
+#Rows parsed at a time when reading a directory of seasons
+CHUNK_ROWS = 50000
+
+#Columns of a Basketball-Reference per game table and the dtype each is kept
+#as. Integer columns that have empty fields (e.g. GS in old seasons) stay
+#float32. When loaded 'Player' is split into 'Player' and 'player_id' and an
+#int16 'Season' column is added
+SCHEMA = {'Rk': 'int16', 'Player': 'object', 'Pos': 'category', 'Age': 'int8',
+          'Tm': 'category', 'G': 'int16', 'GS': 'int16', 'MP': 'float32',
+          'FG': 'float32', 'FGA': 'float32', 'FG%': 'float32', '3P': 'float32',
+          '3PA': 'float32', '3P%': 'float32', '2P': 'float32', '2PA': 'float32',
+          '2P%': 'float32', 'eFG%': 'float32', 'FT': 'float32', 'FTA': 'float32',
+          'FT%': 'float32', 'ORB': 'float32', 'DRB': 'float32', 'TRB': 'float32',
+          'AST': 'float32', 'STL': 'float32', 'BLK': 'float32', 'TOV': 'float32',
+          'PF': 'float32', 'PTS': 'float32'}
+#Decimals the source prints for float columns, everything else has 1
+DECIMALS = {'FG%': 3, '3P%': 3, '2P%': 3, 'eFG%': 3, 'FT%': 3}
 
 TEAM = None
 CHOSEN_STAT = None
 OPPONENT = None
 
+#Spread around a player's average used when simulating points and stats
+POINT_SPREAD = 15
+STAT_SPREAD = 3
+#Games simulated at a time, which bounds the memory of large simulations
+CHUNK_GAMES = 100000
+#Percentiles reported by Team.simulate
+SIM_PERCENTILES = (5, 25, 50, 75, 95)
+#Models Team.simulate can draw points with, see my_module.possession
+GAME_MODELS = ('triangular', 'possession')
+#Stats that teams can be built around
+STATS = ('PTS', 'AST', 'TRB', 'STL', 'BLK')
+#User friendly stat names the GUI and service take, and their columns
+STAT_NAMES = {'Points': 'PTS',
+              'Assists': 'AST',
+              'Rebounds': 'TRB',
+              'Steals': 'STL',
+              'Blocks': 'BLK'}
+#Team types the GUI offers and their short forms, which the service and
+#batch front ends accept exactly
+TEAM_TYPES = ('Balanced (One of Each Position)', 'Unbalanced (Strictly Top Players)',
+              'Balanced', 'Unbalanced')
+#Positions a balanced team has one of each
+POSITIONS = ('C', 'PF', 'PG', 'SF', 'SG')
+#Columns that identify a dataset version together with every numeric column
+KEY_COLUMNS = ('Season', 'player_id', 'Pos', 'Tm')
+
+#Dictionary to convert user friendly team names to dataframe team names
+NBA_TEAMS = {'Atlanta Hawks': 'ATL',
+             'Boston Celtics': 'BOS',
+             'Brooklyn Nets': 'BRK',
+             'Charlotte Hornets': 'CHO',
+             'Chicago Bulls': 'CHI',
+             'Cleveland Cavaliers': 'CLE',
+             'Dallas Mavericks': 'DAL',
+             'Denver Nuggets': 'DEN',
+             'Detroit Pistons': 'DET',
+             'Golden State Warriors': 'GSW',
+             'Houston Rockets': 'HOU',
+             'Indiana Pacers': 'IND',
+             'Los Angeles Clippers': 'LAC',
+             'Los Angeles Lakers': 'LAL',
+             'Memphis Grizzlies': 'MEM',
+             'Miami Heat': 'MIA',
+             'Milwaukee Bucks': 'MIL',
+             'Minnesota Timberwolves': 'MIN',
+             'New Orleans Pelicans': 'NOP',
+             'New York Knicks': 'NYK',
+             'Oklahoma City Thunder': 'OKC',
+             'Orlando Magic': 'ORL',
+             'Philadelphia 76ers': 'PHI',
+             'Phoenix Suns': 'PHO',
+             'Portland Trail Blazers': 'POR',
+             'Sacramento Kings': 'SAC',
+             'San Antonio Spurs': 'SAS',
+             'Toronto Raptors': 'TOR',
+             'Utah Jazz': 'UTA',
+             'Washington Wizards': 'WAS'}
+
+#Bumped whenever the loaded dataset is replaced or marked as edited
+DATA_VERSION = 0
+#(frame, DATA_VERSION, Season column, dataset_key) of the last key computed,
+#so cached lookups only rehash the dataset after it may have changed
+_KEY_MEMO = None
+#Every SeasonCache, so data_changed() can empty them
+_SEASON_CACHES = []
+#Most season selections whose aggregates are kept at once
+MAX_AGGREGATES = 16
+#Season selections kept by each SeasonCache of values built on the aggregates
+SEASON_CACHE_SIZE = 8
+#Teams kept by TEAM_CACHE, room for every default superteam and opponent
+#(5 stats x 2 modes + 5 stats x 30 teams) of two season selections
+TEAM_CACHE_SIZE = 320
+
+
+def __getattr__(name):
+    """Load the dataset the first time the module attribute df is used"""
+    if name == 'df':
+        return get_data()
+    raise AttributeError('module ' + repr(__name__) + ' has no attribute ' + repr(name))
+
+
+def _file_hash(path):
+    """Return sha1 hex digest of a file's contents"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_info(path):
+    """Return name, size and modification time of a source file"""
+    info = os.stat(path)
+    return {'name': os.path.basename(path), 'size': info.st_size, 'mtime_ns': info.st_mtime_ns}
+
+
+def _snapshot_sources(path):
+    """Return the csv files a dataset path is read from, one file or a directory"""
+    if os.path.isdir(path):
+        return [source for _, source in season_files(path)]
+    return [path]
+
+
+def _snapshot_dir(path):
+    """Return the directory a dataset path's snapshot is saved in"""
+    return path.rstrip('/\\') + SNAPSHOT_SUFFIX
+
+
+def season_from_path(path):
+    """Return the season of a per game csv from its file name, e.g. NBA_2020_per_game.csv
+
+    Parameters
+    ----------
+    path : string
+        Path of the csv
+
+    Return
+    ------
+    season : int
+        Year the season ended in, DEFAULT_SEASON if the name has no year
+    """
+    match = SEASON_FILE.search(os.path.basename(path))
+    return int(match.group(1)) if match else DEFAULT_SEASON
+
+
+def season_files(directory):
+    """Return the per game csv files of a directory sorted by season
+
+    Parameters
+    ----------
+    directory : string
+        Directory of per season csv files
+
+    Return
+    ------
+    files : list
+        List of (season, path) tuples
+    """
+    files = sorted((season_from_path(name), os.path.join(directory, name))
+                   for name in os.listdir(directory)
+                   if name.endswith('.csv') and SEASON_FILE.search(name))
+    seasons = [season for season, _ in files]
+    if len(set(seasons)) != len(seasons):
+        raise ValueError(directory + ' has more than one csv for a season')
+    return files
+
+
+def _compact_chunk(chunk, path):
+    """Return the data rows of a raw chunk with 'Player' split into name and id"""
+    missing = [col for col in SCHEMA if col not in chunk.columns]
+    if missing:
+        raise ValueError(path + ' is missing columns ' + str(missing))
+    data_rows = chunk['Rk'].str.isdigit().fillna(False).to_numpy(dtype=bool)
+    chunk = chunk[data_rows].reset_index(drop=True)
+    #Every data row needs a 'Name\\playerid' player
+    parts = chunk['Player'].str.partition('\\')
+    if (parts[1] != '\\').any() or (parts[2] == '').any():
+        bad = chunk['Player'][(parts[1] != '\\') | (parts[2] == '')].iloc[0]
+        raise ValueError(path + ' has a player without an id: ' + repr(bad))
+    chunk['Player'] = parts[0]
+    chunk.insert(chunk.columns.get_loc('Player') + 1, 'player_id', parts[2])
+    chunk['Rk'] = chunk['Rk'].astype(SCHEMA['Rk'])
+    chunk.attrs['rejected_rows'] = int((~data_rows).sum())
+    return chunk
+
+
+def _combine(chunks):
+    """Concatenate compact chunks into one store indexed by (season, player, team)
+
+    Categorical columns get the union of every chunk's categories so they
+    stay categorical, and integer columns are cast down once no rows are
+    empty.
+    """
+    import pandas as pd
+
+    for col in [col for col, dtype in SCHEMA.items() if dtype == 'category']:
+        categories = sorted(set().union(*(chunk[col].cat.categories for chunk in chunks)))
+        for chunk in chunks:
+            chunk[col] = chunk[col].cat.set_categories(categories)
+    frame = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+    for col, dtype in SCHEMA.items():
+        if dtype.startswith('int') and frame[col].dtype != dtype and frame[col].notna().all():
+            frame[col] = frame[col].astype(dtype)
+    frame.attrs['rejected_rows'] = sum(chunk.attrs.get('rejected_rows', 0) for chunk in chunks)
+    return _index_store(frame)
+
+
+def _index_store(frame):
+    """Index a store of statlines by (season, player, team), keeping the columns"""
+    import pandas as pd
+
+    frame.index = pd.MultiIndex.from_arrays([frame['Season'], frame['player_id'], frame['Tm']],
+                                            names=['season', 'player', 'team'])
+    return frame
+
+
+@timed('parse_csv')
+def parse_csv(path, season=None, chunksize=None):
+    """Read a Basketball-Reference per game csv into the compact SCHEMA dtypes
+
+    Rows without a numeric rank (the attribution footer, blank lines or
+    repeated headers) are dropped, and their count is kept in
+    frame.attrs['rejected_rows'].
+
+    Parameters
+    ----------
+    path : string
+        Path of the csv to read
+    season : int, Optional
+        Season of the csv, default=None reads it from the file name
+    chunksize : int, Optional
+        Rows parsed at a time, default=None parses the whole file at once
+
+    Return
+    ------
+    frame : DataFrame
+        DataFrame of player statlines indexed by (season, player, team)
+    """
+    import pandas as pd
+
+    #Integer columns are read as float32 so non-data rows can't break parsing,
+    #and rank is read as text because it is how non-data rows are told apart
+    read_dtypes = {col: ('float32' if dtype.startswith('int') else dtype)
+                   for col, dtype in SCHEMA.items()}
+    read_dtypes['Rk'] = 'object'
+    reader = pd.read_csv(path, dtype=read_dtypes, chunksize=chunksize)
+    chunks = []
+    #Only one raw chunk is alive at a time, the rest are already compact
+    for chunk in ([reader] if chunksize is None else reader):
+        chunk = _compact_chunk(chunk, path)
+        chunk.insert(0, 'Season', np.full(len(chunk), season_from_path(path) if season is None
+                                          else season, dtype=np.int16))
+        chunks.append(chunk)
+    return _combine(chunks)
+
+
+@timed('load_seasons')
+def load_seasons(directory, chunksize=CHUNK_ROWS):
+    """Read every per season csv of a directory into one compact store
+
+    Parameters
+    ----------
+    directory : string
+        Directory of csv files named like NBA_2020_per_game.csv
+    chunksize : int, Optional
+        Rows parsed at a time, default=CHUNK_ROWS
+
+    Return
+    ------
+    frame : DataFrame
+        DataFrame of every season's statlines indexed by (season, player, team)
+    """
+    files = season_files(directory)
+    if not files:
+        raise ValueError(directory + ' has no per season csv files')
+    frame = _combine([parse_csv(path, season, chunksize) for season, path in files])
+    if not frame.index.is_unique:
+        raise ValueError(directory + ' has a player listed twice for a team in a season')
+    return frame
+
+
+def column_decimals(col):
+    """Return how many decimals the source prints for a numeric column"""
+    if SCHEMA.get(col, 'float32').startswith('int'):
+        return 0
+    return DECIMALS.get(col, 1)
+
+
+@timed('write_snapshot')
+def _write_snapshot(path, frame):
+    """Save a DataFrame as memory-mappable .npy files next to its source csv
+    or directory of csv files
+
+    Numeric columns are stored as one 2D array per dtype, categorical columns
+    as their codes and text columns as fixed-width unicode arrays. meta.json
+    is written last, so a snapshot without it is never read.
+
+    Parameters
+    ----------
+    path : string
+        Path of the source csv or directory
+    frame : DataFrame
+        DataFrame parsed from the source
+    """
+    directory = _snapshot_dir(path)
+    os.makedirs(directory, exist_ok=True)
+    meta_path = os.path.join(directory, 'meta.json')
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    sources = [dict(_source_info(source), sha1=_file_hash(source))
+               for source in _snapshot_sources(path)]
+    meta = dict(format=SNAPSHOT_FORMAT, sources=sources, columns=[str(col) for col in frame.columns], numbers={}, text=[],
+                categories={}, attrs=frame.attrs)
+    groups = {}
+    for loc, col in enumerate(frame.columns):
+        if frame[col].dtype == 'category':
+            _save_array(os.path.join(directory, 'codes-' + str(loc) + '.npy'),
+                        frame[col].cat.codes.to_numpy())
+            meta['categories'][col] = frame[col].cat.categories.tolist()
+        elif frame[col].dtype == object:
+            #Empty fields are parsed as NaN, so '' can stand in for them
+            values = np.array(frame[col].fillna('').tolist(), dtype=str)
+            _save_array(os.path.join(directory, 'text-' + str(loc) + '.npy'), values)
+            meta['text'].append(col)
+        else:
+            groups.setdefault(frame[col].dtype.str, []).append(col)
+    for dtype, cols in groups.items():
+        _save_array(os.path.join(directory, 'numbers-' + dtype.lstrip('<>|=') + '.npy'),
+                    np.ascontiguousarray(frame[cols].to_numpy(dtype=dtype)))
+        meta['numbers'][dtype] = cols
+
+    _save_text(meta_path, json.dumps(meta))
+
+
+def _save_array(path, values):
+    """Save an array under a temporary name and move it into place"""
+    temp = path + '.' + str(os.getpid()) + '.tmp'
+    with open(temp, 'wb') as target:
+        np.save(target, values)
+    os.replace(temp, path)
+
+
+def _save_text(path, text):
+    """Save a string under a temporary name and move it into place"""
+    temp = path + '.' + str(os.getpid()) + '.tmp'
+    with open(temp, 'w') as target:
+        target.write(text)
+    os.replace(temp, path)
+
+
+@timed('read_snapshot')
+def _read_snapshot(path):
+    """Return the DataFrame of a dataset's snapshot if the snapshot is up to date
+
+    Numeric columns are memory-mapped copy-on-write, so processes that load
+    the same snapshot share its pages until one of them edits a value.
+
+    Parameters
+    ----------
+    path : string
+        Path of the source csv or directory
+
+    Return
+    ------
+    frame : DataFrame or None
+        DataFrame of the snapshot, None if there is no usable snapshot
+    """
+    import pandas as pd
+
+    directory = _snapshot_dir(path)
+    meta_path = os.path.join(directory, 'meta.json')
+    try:
+        with open(meta_path) as source:
+            meta = json.load(source)
+    except (OSError, ValueError):
+        return None
+    if meta.get('format') != SNAPSHOT_FORMAT:
+        return None
+    sources = _snapshot_sources(path)
+    if [source['name'] for source in meta['sources']] != [os.path.basename(source)
+                                                          for source in sources]:
+        return None
+    touched = False
+    for saved, source in zip(meta['sources'], sources):
+        info = _source_info(source)
+        if info['size'] != saved['size'] or info['mtime_ns'] != saved['mtime_ns']:
+            #Only the timestamp changed (e.g. a fresh checkout), keep the snapshot
+            if info['size'] != saved['size'] or _file_hash(source) != saved['sha1']:
+                return None
+            saved.update(info)
+            touched = True
+    if touched:
+        try:
+            _save_text(meta_path, json.dumps(meta))
+        except OSError:
+            pass
+
+    #The dtype with the most columns (the float32 stats) becomes the frame's
+    #main block, every other column is inserted next to it as its own block
+    groups = {dtype: np.load(os.path.join(directory, 'numbers-' + dtype.lstrip('<>|=') + '.npy'),
+                             mmap_mode='c') for dtype in meta['numbers']}
+    main = max(meta['numbers'], key=lambda dtype: len(meta['numbers'][dtype]))
+    frame = pd.DataFrame(groups[main], columns=meta['numbers'][main], copy=False)
+    columns = {col: (dtype, index) for dtype, cols in meta['numbers'].items()
+               for index, col in enumerate(cols) if dtype != main}
+    for loc, col in enumerate(meta['columns']):
+        if col in columns:
+            dtype, index = columns[col]
+            frame.insert(loc, col, groups[dtype][:, index])
+        elif col in meta['categories']:
+            codes = np.load(os.path.join(directory, 'codes-' + str(loc) + '.npy'))
+            frame.insert(loc, col, pd.Categorical.from_codes(codes, meta['categories'][col]))
+        elif col in meta['text']:
+            values = np.load(os.path.join(directory, 'text-' + str(loc) + '.npy')).astype(object)
+            values[values == ''] = np.nan
+            frame.insert(loc, col, values)
+    frame.attrs.update(meta['attrs'])
+    return _index_store(frame)
+
+
+def load_data(path=None, snapshot=True):
+    """Read the player dataset and make it the loaded dataset
+
+    The first time a dataset is read a binary snapshot is saved next to it,
+    and later loads memory-map that snapshot until the csv files change.
+
+    Parameters
+    ----------
+    path : string, Optional
+        Path of the csv or directory of per season csv files to read,
+        default=None uses DATA_PATH
+    snapshot : bool, Optional
+        Whether to use and save the binary snapshot, default=True
+
+    Return
+    ------
+    df : DataFrame
+        DataFrame of player statlines in the compact SCHEMA dtypes
+    """
+    global df
+    path = DATA_PATH if path is None else path
+    frame = _read_snapshot(path) if snapshot else None
+    if snapshot:
+        count('snapshot_hit' if frame is not None else 'snapshot_miss')
+    if frame is None:
+        frame = load_seasons(path) if os.path.isdir(path) else parse_csv(path)
+        if snapshot:
+            #Snapshots are only an optimization, e.g. skip read-only folders
+            try:
+                _write_snapshot(path, frame)
+            except OSError:
+                pass
+    df = frame
+    data_changed()
+    return df
+
+
+def get_data():
+    """Return the loaded dataset, reading it from DATA_PATH on first use
+
+    Return
+    ------
+    df : DataFrame
+        DataFrame of player statlines
+    """
+    if 'df' not in globals():
+        return load_data()
+    return df
+
+
+def set_data_path(path):
+    """Change where the dataset is read from, the new data is read on next use
+
+    Parameters
+    ----------
+    path : string
+        Path of the csv or directory of per season csv files to read
+    """
+    global DATA_PATH
+    DATA_PATH = path
+    globals().pop('df', None)
+    data_changed()
+
+
+def data_changed():
+    """Mark the loaded dataset as changed, so cached aggregates and teams are checked again
+
+    Replacing df or editing it through loc, iloc, at or by setting a column
+    is noticed on its own. Call this after writing to a column's array
+    directly, e.g. df['PTS'].to_numpy()[0] = 30.0, which pandas can't see.
+    """
+    global DATA_VERSION, _KEY_MEMO
+    DATA_VERSION += 1
+    #Also let go of the old frame and everything built from it
+    _KEY_MEMO = None
+    for cache in _SEASON_CACHES:
+        cache.clear()
+
+
+def _simulate_totals(means, spread, n_games, rng):
+    """Simulate n_games team totals where each player is a triangular draw
+
+    Parameters
+    ----------
+    means : list
+        List of each player's average per game as floats
+    spread : float
+        Distance of the upper and lower bound from each player's average
+    n_games : int
+        Number of games to simulate
+    rng : numpy.random.Generator
+        Generator used for the draws
+
+    Return
+    ------
+    totals : numpy.ndarray
+        Integer array of length n_games with each game's team total
+    """
+    totals = np.zeros(n_games)
+    #Draw one column of games per player so every bound stays a scalar, which
+    #is much faster than broadcasting array bounds over an (n_games, 5) block
+    for mean in np.asarray(means, dtype=np.float64).tolist():
+        #Lower bound doesn't go negative, same as the single game methods
+        lower = max(mean - spread, 0)
+        totals += rng.triangular(lower, mean, mean + spread, n_games)
+    #Change totals to whole integers the same way int() does
+    return totals.astype(np.int64)
+
+
+def _draw_total(means, spread):
+    """Return int of one game's total drawn with the global random module
+
+    Parameters
+    ----------
+    means : numpy.ndarray
+        Each player's average per game
+    spread : float
+        Distance of the upper and lower bound from each player's average
+
+    Return
+    ------
+    total : int
+        Total of one triangular draw per player
+    """
+    total = 0
+    #Iterate over each player's average per game
+    for mean in means.tolist():
+        #Create an upper bound
+        upper = mean+spread
+        #Create a lower bound that doesn't go negative
+        if mean-spread < 0:
+            lower = 0
+        else:
+            lower = mean-spread
+        #Create a random total that a player could get in a game
+        total += rd.triangular(lower, upper, mean)
+    #Change total to a whole integer
+    return int(total)
+
+
+def _summarize(values, percentiles):
+    """Return dictionary of percentile to value for an array of simulated values"""
+    return dict(zip(percentiles, np.percentile(values, percentiles)))
+
 class Team():
     """Class that stores top 5 players names, stats and average points per team
 
+    The roster is kept as arrays of each player's average stat, average
+    points and position code (index into POSITIONS, -1 for other positions)
+    with names and positions alongside, so simulations use it directly and
+    it pickles compactly. Teams without positions have positions of None.
+    Teams built from the dataset also keep their players' ids and the
+    seasons they were picked from, so models that look players up again
+    find the same players, not whoever has the name in other seasons.
+
     Parameters
     ----------
     players : dict
-        Dictionary with keys of names of players as strings and values as average stats per game
+        Dictionary with keys of names of players as strings and values as average
+        stats per game, or [average stat, position] lists for balanced teams
     point : list
         List of average points per game as floats
     team : string
         String of team
+    player_ids : list, Optional
+        List of the players' ids in the same order, default=None for teams
+        not built from the dataset
+    season : int, tuple or range, Optional
+        Season or (first, last) seasons the players' averages are from,
+        default=None for every loaded season
     """
-    def __init__(self, players, point, team):
-        self.players = players
-        self.point = point
+    __slots__ = ('names', 'positions', 'stat_values', 'point_values', 'position_codes', 'team',
+                 'player_ids', 'season')
+
+    def __init__(self, players, point, team, player_ids=None, season=None):
+        self.names = tuple(players)
+        values = list(players.values())
+        #Balanced teams give [stat, position] for each player
+        if values and isinstance(values[0], list):
+            self.stat_values = np.array([plyr_st[0] for plyr_st in values], dtype=np.float64)
+            self.positions = tuple(plyr_st[1] for plyr_st in values)
+            self.position_codes = np.array([POSITIONS.index(pos) if pos in POSITIONS else -1
+                                            for pos in self.positions], dtype=np.int8)
+        else:
+            self.stat_values = np.array(values, dtype=np.float64)
+            self.positions = None
+            self.position_codes = None
+        self.point_values = np.array(point, dtype=np.float64)
+        if len(self.point_values) != len(self.names) or \
+                (player_ids is not None and len(player_ids) != len(self.names)):
+            raise ValueError('every player needs one points average and id, got ' +
+                             str(len(self.names)) + ' players')
         self.team = team
+        self.player_ids = None if player_ids is None else tuple(player_ids)
+        self.season = season_bounds(season)
+
+    @property
+    def players(self):
+        """Dictionary of player names to average stats, or [stat, position] lists"""
+        stats = self.stat_values.tolist()
+        if self.positions is None:
+            return dict(zip(self.names, stats))
+        return {name: [spg, pos] for name, spg, pos in zip(self.names, stats, self.positions)}
+
+    @property
+    def point(self):
+        """Array of each player's average points per game"""
+        return self.point_values
 
+    def __getstate__(self):
+        return tuple(getattr(self, slot) for slot in Team.__slots__)
 
-    def points(self):
+    def __setstate__(self, state):
+        for slot, value in zip(Team.__slots__, state):
+            setattr(self, slot, value)
+
+    @timed('team_points')
+    def points(self, rng=None):
         """Generates an estimated total amount of points the Team would score in a game
 
         Parameters
         ----------
-        self.points : list
+        self.point_values : numpy.ndarray
             Class attribute of average points per game for each player
+        rng : numpy.random.Generator or int, Optional
+            Generator or seed for the draws, default=None uses the global
+            random module
 
         Return
         ------
         total : int
             Total amount of estimated points scored
         """
-        total = 0
-
-        #Iterate over each player's average points per game
-        for plyr_pt in self.point:
-            #Create an upper bound for points
-            upper = plyr_pt+15
-            #Create a lower bound for points that doesn't go negative
-            if plyr_pt-15 < 0:
-                lower = 0
-            else:
-                lower = plyr_pt-15
-            #Create a random point total that a player could score in a game
-            total += rd.triangular(lower, upper, plyr_pt)
-
-        #Change point total to a whole integer
-        return int(total)
-
-    def stat(self):
+        if rng is not None:
+            #Draw one game from the given stream the same way simulate() does
+            return int(_simulate_totals(self.point_values, POINT_SPREAD, 1,
+                                        np.random.default_rng(rng))[0])
+        return _draw_total(self.point_values, POINT_SPREAD)
+
+    @timed('team_stat')
+    def stat(self, rng=None):
         """Calculates an estimated total amount of the specific stat focused \
             on the Team would acquire in a game
 
         Parameters
         ----------
-        self.players : dict
-            Class attribute of average stat per game for each player in a dict
+        self.stat_values : numpy.ndarray
+            Class attribute of average stat per game for each player
+        rng : numpy.random.Generator or int, Optional
+            Generator or seed for the draws, default=None uses the global
+            random module
 
         Return
         ------
         total : int
             Total amount of estimateed stat acquired
         """
-        total = 0
-
-        #Check if players dictionary includes position or not
-        if isinstance(list(self.players.values())[0], list):
-            #Iterate over player's average stats per game
-            for plyr_st in self.players.values():
-                #Create an upper bound for stat
-                upper = plyr_st[0]+3
-                #Create a lower bound for stat that doesn't go negative
-                if plyr_st[0]-3 < 0:
-                    lower = 0
-                else:
-                    lower = plyr_st[0]-3
-                #Create a random stat total that a player could acquire in a game
-                total += rd.triangular(lower, upper, plyr_st[0])
+        if rng is not None:
+            #Draw one game from the given stream the same way simulate() does
+            return int(_simulate_totals(self.stat_values, STAT_SPREAD, 1,
+                                        np.random.default_rng(rng))[0])
+        return _draw_total(self.stat_values, STAT_SPREAD)
+
+    def stat_means(self):
+        """Return each player's average stat per game
+
+        Return
+        ------
+        means : numpy.ndarray
+            Array of average stats, with positions left out
+        """
+        return self.stat_values
+
+    @timed('team_simulate')
+    def simulate(self, n_games, opponent=None, percentiles=SIM_PERCENTILES, rng=None,
+                 model='triangular'):
+        """Simulate many games at once instead of one game per call
+
+        Uses the same triangular model as points() and stat() (+/- 15 points,
+        +/- 3 stat, clamped at zero), but draws every game in a batch. With
+        model='possession' points are played out possession by possession
+        from the players' shooting and turnover rates instead.
+
+        Parameters
+        ----------
+        n_games : int
+            Number of games to simulate
+        opponent : Team, Optional
+            Team to play against, default=None only simulates this Team
+        percentiles : tuple, Optional
+            Percentiles to report, default=SIM_PERCENTILES
+        rng : numpy.random.Generator or int, Optional
+            Generator or seed for the draws, default=None uses fresh entropy
+        model : string, Optional
+            One of GAME_MODELS to draw points with, default='triangular'
+
+        Return
+        ------
+        results : dict
+            Dictionary with 'points' and 'stats' arrays, 'mean_points' and
+            'points_percentiles'. With an opponent it also has
+            'opponent_points', 'opponent_stats', 'margin', 'win_prob',
+            'tie_prob', 'loss_prob', 'mean_margin' and 'margin_percentiles'
+        """
+        if n_games < 1:
+            raise ValueError('n_games must be at least 1')
+        if model not in GAME_MODELS:
+            raise ValueError('model must be one of ' + str(GAME_MODELS))
+        rng = np.random.default_rng(rng)
+        if model == 'possession':
+            #Imported here since possession imports this module
+            from .possession import simulate_possessions
+
+            def draw_points(team):
+                return simulate_possessions(team, n_games, rng)['points']
         else:
-            #Iterate over player's average stats per game as the 0th element
-            for plyr_st in self.players.values():
-                #Create an upper bound for stat
-                upper = plyr_st+3
-                #Create a lower bound for stat that doesn't go negative
-                if plyr_st-3 < 0:
-                    lower = 0
-                else:
-                    lower = plyr_st-3
-                #Create a random stat total that a player could acquire in a game
-                total += rd.triangular(lower, upper, plyr_st)
-
-        #Change stat total to a whole integer
-        return int(total)
+            def draw_points(team):
+                return _simulate_totals(team.point_values, POINT_SPREAD, n_games, rng)
+
+        team_pts = draw_points(self)
+        results = {'points': team_pts,
+                   'stats': _simulate_totals(self.stat_values, STAT_SPREAD, n_games, rng),
+                   'mean_points': float(team_pts.mean()),
+                   'points_percentiles': _summarize(team_pts, percentiles)}
+        if opponent is None:
+            return results
+
+        oppo_pts = draw_points(opponent)
+        margin = team_pts - oppo_pts
+        results['opponent_points'] = oppo_pts
+        results['opponent_stats'] = _simulate_totals(opponent.stat_values, STAT_SPREAD,
+                                                     n_games, rng)
+        results['margin'] = margin
+        results['win_prob'] = float(np.count_nonzero(margin > 0)) / n_games
+        results['tie_prob'] = float(np.count_nonzero(margin == 0)) / n_games
+        results['loss_prob'] = float(np.count_nonzero(margin < 0)) / n_games
+        results['mean_margin'] = float(margin.mean())
+        results['margin_percentiles'] = _summarize(margin, percentiles)
+        return results
 
 
 class SuperTeam(Team):
@@ -116,12 +805,470 @@ class SuperTeam(Team):
         List of average points per game as floats
     team : string, Optional
         String of teamname, default = 'Superteam'
+    player_ids : list, Optional
+        List of the players' ids in the same order, default=None
+    season : int, tuple or range, Optional
+        Season or (first, last) seasons the players' averages are from,
+        default=None for every loaded season
+    """
+    __slots__ = ()
+
+    def __init__(self, players, point, team='Superteam', player_ids=None, season=None):
+        super().__init__(players, point, team, player_ids, season)
+
+
+class PlayerAggregates():
+    """Class that stores per-player averages of a dataset, built once per dataset
+
+    Players that were on multiple teams have their statlines averaged
+    together. Players are indexed by player_id and kept in 'Name\\playerid'
+    order, so ranking ties break the same way as grouping the raw csv does.
+
+    Parameters
+    ----------
+    frame : DataFrame
+        DataFrame of player statlines in the SCHEMA dtypes
+    key : tuple
+        Dataset key the aggregates were built from
+    """
+    def __init__(self, frame, key):
+        self.key = key
+        #Record each player's name and primary position from their first statline
+        first_rows = frame.drop_duplicates('player_id')
+        self.names = dict(zip(first_rows['player_id'], first_rows['Player']))
+        self.positions = dict(zip(first_rows['player_id'],
+                                  first_rows['Pos'].astype(str).str.split('-').str[0]))
+        #Record every position each player was listed at, in any statline
+        self.eligible = {}
+        for plyr, pos in frame[['player_id', 'Pos']].drop_duplicates().itertuples(index=False):
+            for part in str(pos).split('-'):
+                self.eligible.setdefault(plyr, set()).add(part)
+        self.eligible_sorted = {}
+        #Name to player id, built the first time players are found by name
+        self.by_name = None
+        #Stat columns as float arrays in means order, built when first scored
+        self.matrices = {}
+        #Restore the exact values the source printed before averaging float32 stats
+        stats = frame.select_dtypes('number').astype('float64')
+        stats = stats.round({col: column_decimals(col) for col in stats.columns})
+        #Group players together who were on multiple teams and have
+        #different statlines for each team
+        means = stats.groupby(frame['player_id'].to_numpy()).mean()
+        self.means = means.loc[sorted(means.index, key=lambda plyr: self.names[plyr] + '\\' + plyr)]
+        #Presort players by every supported stat up front
+        self.sorted = {stat: self.means.sort_values(stat, ascending=False)
+                       for stat in STATS}
+        #Index every player that has been on each team
+        self.rosters = {team: players for team, players in
+                        frame.groupby('Tm', observed=True)['player_id'].unique().items()}
+        #Presort each team's players by every supported stat, keeping the
+        #league-wide order so ties break the same way
+        self.team_sorted = {team: {stat: self._team_slice(team, stat) for stat in STATS}
+                            for team in self.rosters}
+        #Rank players at each primary position for every supported stat
+        self.position_sorted = {stat: self._position_slices(stat) for stat in STATS}
+
+    def ranked(self, stat):
+        """Return player averages sorted from best to worst for a stat
+
+        Parameters
+        ----------
+        stat : string
+            The type of stat to sort by
+
+        Return
+        ------
+        sorted : DataFrame
+            Player averages sorted by the stat
+        """
+        #Other numeric columns get sorted the first time they are asked for
+        if stat not in self.sorted:
+            self.sorted[stat] = self.means.sort_values(stat, ascending=False)
+        return self.sorted[stat]
+
+    def _team_slice(self, team, stat):
+        """Return the players of a team out of the league-wide ranking for a stat"""
+        top = self.ranked(stat)
+        return top[top.index.isin(self.rosters[team])]
+
+    def _position_slices(self, stat):
+        """Return overall rankings for a stat split up by primary position"""
+        rankings = {}
+        #Walk the overall ranking so each position's list stays sorted
+        for rank, player in enumerate(self.ranked(stat).index):
+            rankings.setdefault(self.positions[player], []).append(rank)
+        return rankings
+
+    def position_ranked(self, stat):
+        """Return each primary position's players ranked by a stat
+
+        Parameters
+        ----------
+        stat : string
+            The type of stat to sort by
+
+        Return
+        ------
+        rankings : dict
+            Dictionary with keys of positions and values of lists of the
+            overall ranks of that position's players, from best to worst
+        """
+        if stat not in self.position_sorted:
+            self.position_sorted[stat] = self._position_slices(stat)
+        return self.position_sorted[stat]
+
+    def eligible_ranked(self, stat):
+        """Return the players eligible at each position ranked by a stat
+
+        Unlike position_ranked(), players listed at more than one position,
+        e.g. 'SF-PF', show up in the ranking of every one of them.
+
+        Parameters
+        ----------
+        stat : string
+            The type of stat to sort by
+
+        Return
+        ------
+        rankings : dict
+            Dictionary with keys of positions and values of lists of the
+            overall ranks of that position's eligible players, from best to worst
+        """
+        if stat not in self.eligible_sorted:
+            rankings = {}
+            for rank, player in enumerate(self.ranked(stat).index):
+                for pos in self.eligible[player]:
+                    rankings.setdefault(pos, []).append(rank)
+            self.eligible_sorted[stat] = rankings
+        return self.eligible_sorted[stat]
+
+    def label(self, plyr):
+        """Return 'Name\\playerid' of a player id, which always finds only that player"""
+        return self.names[plyr] + '\\' + plyr
+
+    def lineup_names(self, player_ids):
+        """Return the name each player of a lineup is keyed by
+
+        Players who share a name with another player of the lineup, e.g. from
+        different eras, are keyed by their 'Name\\playerid' label instead, so
+        none of them replaces another in a players dictionary.
+
+        Parameters
+        ----------
+        player_ids : list
+            List of the lineup's player ids
+
+        Return
+        ------
+        names : list
+            List of names or labels in the same order
+        """
+        names = [self.names[plyr] for plyr in player_ids]
+        return [self.label(plyr) if names.count(name) > 1 else name
+                for name, plyr in zip(names, player_ids)]
+
+    def ids_for(self, names):
+        """Return the player ids of players found by name
+
+        Players who share a name resolve to the first one in 'Name\\id' order,
+        unless they are given by their 'Name\\playerid' label.
+
+        Parameters
+        ----------
+        names : list
+            List of player names or labels, e.g. a Team's names
+
+        Return
+        ------
+        ids : list
+            List of player ids in the same order
+        """
+        if self.by_name is None:
+            self.by_name = {}
+            for plyr in self.means.index:
+                self.by_name.setdefault(self.names[plyr], plyr)
+        ids = []
+        for name in names:
+            plyr = name.rpartition('\\')[2]
+            ids.append(plyr if plyr in self.names and name == self.label(plyr)
+                       else self.by_name.get(name))
+        missing = [name for name, plyr in zip(names, ids) if plyr is None]
+        if missing:
+            raise KeyError('players not in the dataset: ' + str(missing))
+        return ids
+
+    def matrix(self, columns):
+        """Return player averages of some columns as one array
+
+        Parameters
+        ----------
+        columns : tuple
+            Tuple of the columns, e.g. ('PTS', 'TRB', 'TOV')
+
+        Return
+        ------
+        matrix : numpy.ndarray
+            Read-only float64 array of shape (players, columns) in means order
+        """
+        if columns not in self.matrices:
+            matrix = self.means[list(columns)].to_numpy(dtype=np.float64)
+            matrix.flags.writeable = False
+            self.matrices[columns] = matrix
+        return self.matrices[columns]
+
+    def team_ids(self, team):
+        """Return the player ids of a Team's players
+
+        Teams built from the dataset keep their players' ids, other Teams are
+        found by name with ids_for().
+
+        Parameters
+        ----------
+        team : Team
+            Team whose players are in these aggregates
+
+        Return
+        ------
+        ids : list
+            List of player ids in the Team's order
+        """
+        if team.player_ids is None:
+            return self.ids_for(team.names)
+        missing = [plyr for plyr in team.player_ids if plyr not in self.names]
+        if missing:
+            raise KeyError('players not in the dataset: ' + str(missing))
+        return list(team.player_ids)
+
+    def team_ranked(self, team, stat):
+        """Return averages of a team's players sorted from best to worst for a stat
+
+        Parameters
+        ----------
+        team : string
+            Abbreviation of the team, e.g. 'LAL'
+        stat : string
+            The type of stat to sort by
+
+        Return
+        ------
+        sorted : DataFrame
+            Averages of the team's players sorted by the stat
+        """
+        team_sorted = self.team_sorted[team]
+        if stat not in team_sorted:
+            team_sorted[stat] = self._team_slice(team, stat)
+        return team_sorted[stat]
+
+
+def dataset_key(frame):
+    """Return a key that changes whenever the rows or any numeric column of a dataset change
+
+    Every numeric column is hashed, not only STATS, since PlayerAggregates
+    averages all of them and rankings, models and matrices read any of them.
+
+    Parameters
+    ----------
+    frame : DataFrame
+        DataFrame of player statlines
+
+    Return
+    ------
+    key : tuple
+        Hashable key for the dataset
+    """
+    import pandas as pd
+
+    numeric = frame.select_dtypes('number').columns
+    values = []
+    for col in KEY_COLUMNS + tuple(col for col in numeric if col not in KEY_COLUMNS):
+        #Read the arrays behind each column, skipping Series accessors
+        array = frame[col].array
+        #Categoricals are compared by their codes instead of building strings
+        if isinstance(array, pd.Categorical):
+            values.append(array.codes.tobytes())
+            values.append(tuple(array.categories))
+        else:
+            values.append(np.asarray(array).tobytes())
+    return (id(frame), frame.shape, hash(tuple(values)))
+
+
+def current_key(frame):
+    """Return dataset_key of a frame, hashing it again only when it may have changed
+
+    pandas returns the same Series for a column until the frame is edited
+    through loc, iloc, at or by setting a column, which all clear its cached
+    columns. A new Series for the first of KEY_COLUMNS means the frame is
+    hashed again, otherwise the key of the frame and DATA_VERSION is reused.
+
+    Parameters
+    ----------
+    frame : DataFrame
+        DataFrame of player statlines, usually the loaded dataset
+
+    Return
+    ------
+    key : tuple
+        Hashable key for the dataset
+    """
+    global _KEY_MEMO
+    memo = _KEY_MEMO
+    column = frame[KEY_COLUMNS[0]]
+    if memo is not None and memo[0] is frame and memo[1] == DATA_VERSION and memo[2] is column:
+        return memo[3]
+    key = dataset_key(frame)
+    _KEY_MEMO = (frame, DATA_VERSION, column, key)
+    return key
+
+
+def season_bounds(season):
+    """Return (first, last) seasons of a season selection
+
+    Parameters
+    ----------
+    season : int, tuple or range
+        One season, a (first, last) tuple of seasons or a range of seasons,
+        None selects every loaded season
+
+    Return
+    ------
+    bounds : tuple or None
+        Tuple of first and last season, None for every season
+    """
+    if season is None:
+        return None
+    if isinstance(season, range):
+        if len(season) == 0:
+            raise ValueError('season range is empty')
+        return (min(season), max(season))
+    if isinstance(season, (tuple, list)):
+        if len(season) != 2 or season[0] > season[1]:
+            raise ValueError('season must be a (first, last) tuple, got ' + repr(season))
+        return (int(season[0]), int(season[1]))
+    return (int(season), int(season))
+
+
+def select_seasons(frame, bounds):
+    """Return the statlines of a store within (first, last) seasons
+
+    Parameters
+    ----------
+    frame : DataFrame
+        DataFrame of player statlines
+    bounds : tuple or None
+        Tuple of first and last season from season_bounds, None for every season
+
+    Return
+    ------
+    frame : DataFrame
+        DataFrame of the selected seasons' statlines
+    """
+    if bounds is None:
+        return frame
+    seasons = frame['Season'].to_numpy()
+    #Stores are kept in season order so a selection is a slice of rows
+    if frame['Season'].is_monotonic_increasing:
+        start = np.searchsorted(seasons, bounds[0], side='left')
+        stop = np.searchsorted(seasons, bounds[1], side='right')
+        return frame.iloc[start:stop]
+    return frame[(seasons >= bounds[0]) & (seasons <= bounds[1])]
+
+
+class SeasonCache():
+    """Class that keeps one value per season selection of the loaded dataset,
+    safe to share between threads
+
+    A value is built again once the dataset it was built from changes, and
+    when maxsize selections are kept the one added first is forgotten.
+    data_changed() empties every SeasonCache.
+
+    Parameters
+    ----------
+    name : string
+        Name counted as name + '_cache_hit' or name + '_cache_miss' by metrics
+    maxsize : int, Optional
+        Most season selections kept, default=SEASON_CACHE_SIZE
+    """
+    def __init__(self, name, maxsize=SEASON_CACHE_SIZE):
+        self.name = name
+        self.maxsize = maxsize
+        self._values = {}
+        self._lock = threading.Lock()
+        _SEASON_CACHES.append(self)
+
+    def get(self, bounds, key, build):
+        """Return the value of a season selection, building and keeping it on a miss
+
+        Parameters
+        ----------
+        bounds : tuple or None
+            Season selection from season_bounds
+        key : tuple
+            dataset_key of the dataset the value has to be built from
+        build : function
+            Function taking no arguments that returns the value, run outside
+            the lock
+
+        Return
+        ------
+        value : object
+            Cached or newly built value
+        """
+        with self._lock:
+            entry = self._values.get(bounds)
+        if entry is not None and entry[0] == key:
+            count(self.name + '_cache_hit')
+            return entry[1]
+        count(self.name + '_cache_miss')
+        value = build()
+        with self._lock:
+            if bounds not in self._values and len(self._values) >= self.maxsize:
+                #Forget the selection that was added first
+                del self._values[next(iter(self._values))]
+            self._values[bounds] = (key, value)
+        return value
+
+    def clear(self):
+        """Forget every value"""
+        with self._lock:
+            self._values.clear()
+
+    def __len__(self):
+        return len(self._values)
+
+
+#Aggregates of the loaded dataset for each season selection
+_AGGREGATES = SeasonCache('aggregates', MAX_AGGREGATES)
+
+
+def player_aggregates(season=None):
+    """Return the PlayerAggregates of the loaded dataset, rebuilding it only
+    when the dataset has changed
+
+    Parameters
+    ----------
+    season : int, tuple or range, Optional
+        Season or seasons to aggregate, default=None uses every loaded season
+
+    Return
+    ------
+    aggregates : PlayerAggregates
+        Cached per-player averages
     """
-    def __init__(self, players, point, team='Superteam'):
-        super().__init__(players, point, team)
+    frame = get_data()
+    key = current_key(frame)
+    bounds = season_bounds(season)
 
+    def build():
+        selected = select_seasons(frame, bounds)
+        if len(selected) == 0:
+            raise ValueError('no statlines loaded for season ' + repr(season))
+        with timer('build_aggregates'):
+            return PlayerAggregates(selected, key)
+    return _AGGREGATES.get(bounds, key, build)
 
-def top_5(stat, team=None):
+
+@timed('top_5')
+def top_5(stat, team=None, season=None, ids=False):
     """Return top 5 players' name, average stat, and points per game for a given stat
 
     Parameters
@@ -130,59 +1277,211 @@ def top_5(stat, team=None):
         The type of stat going to be compared
     team : string, Optional
         Name of team if only one team is desired, default=None
+    season : int, tuple or range, Optional
+        Season or (first, last) seasons to pick players from, default=None
+        uses every loaded season
+    ids : bool, Optional
+        Whether to also return the players' ids last, default=False
 
     Return
     ------
     players : dict
-        Dictionary with key of players and values of their average stats per game
+        Dictionary with key of players and values of their average stats per game,
+        players who share a name are keyed by 'Name\\playerid'
     points : list
         List of players' average points per game
     """
     players = {}
     points = []
+    aggregates = player_aggregates(season)
 
     if team is None:
-        #Group and sort players together who were on multiple teams and have
-        #different statlines for each team
-        top = df.groupby('Player').mean().sort_values(stat, ascending=False)
-        for index in range(0, 5):
-            #Edits name of player to take out the player's tag
-            name = top.index[index].split('\\')[0]
-            #Get average stat of player
-            spg = top[stat][index]
-            #Get average points of player
-            ppg = top['PTS'][index]
-            #Append player's stats to the players dictionary
-            players[name] = spg
-            #Append player's points to the points list
-            points.append(ppg)
-        return players, points
-    team_players = []
-    #Get all players that have been on the specific team
-    for tm_plyr in df.where(df['Tm'] == team).dropna().reset_index(drop=True)['Player']:
-        team_players.append(tm_plyr)
-    #Sort players based on stat
-    sorted_players = df.groupby('Player').mean().sort_values(stat, ascending=False)
-    counter = 0
-    #While loop that iterates through sorted players until 5 players are added.
-    while len(points) < 5:
-        #Checks if player is on the desired team
-        if sorted_players.index[counter] in team_players:
-            #Edits name of player to take out the player's tag
-            name = sorted_players.index[counter].split('\\')[0]
-            #Get average stat of player
-            spg = sorted_players[stat][counter]
-            #Get average points of player
-            ppg = sorted_players['PTS'][counter]
-            #Append player's stats to the players dictionary
-            players[name] = spg
-            #Append player's points to the points list
-            points.append(ppg)
-        counter += 1
-    return players, points, team
-
-
-def top_5_balanced(stat):
+        #Get players sorted by stat from the cached per-player averages
+        top = aggregates.ranked(stat)
+    else:
+        #Get the team's players, already sorted by stat in the team index
+        top = aggregates.team_ranked(team, stat)
+    player_ids = top.index[:5].tolist()
+    #Get names of players from their player ids, players who share a name are
+    #kept apart by their 'Name\\playerid' label
+    names = aggregates.lineup_names(player_ids)
+    for index, name in enumerate(names):
+        #Get average stat of player
+        spg = top[stat].iloc[index]
+        #Get average points of player
+        ppg = top['PTS'].iloc[index]
+        #Append player's stats to the players dictionary
+        players[name] = spg
+        #Append player's points to the points list
+        points.append(ppg)
+    picked = (players, points) if team is None else (players, points, team)
+    return picked + (player_ids,) if ids else picked
+
+
+def top_5_all_teams(stat, season=None):
+    """Return top 5 players of every NBA team for a given stat at once
+
+    Parameters
+    ----------
+    stat : string
+        The type of stat going to be compared
+    season : int, tuple or range, Optional
+        Season or (first, last) seasons to pick players from, default=None
+        uses every loaded season
+
+    Return
+    ------
+    teams : dict
+        Dictionary with keys of team names and values of top_5(stat, team)
+        for that team, teams without players in the seasons are left out
+    """
+    rosters = player_aggregates(season).rosters
+    return {name: top_5(stat, team, season) for name, team in NBA_TEAMS.items()
+            if team in rosters}
+
+
+@timed('top_5_weighted')
+def top_5_weighted(weights, team=None, season=None):
+    """Return top 5 players' name, weighted score, and points per game for
+    one or many weightings of stats
+
+    Every player is scored for every weighting in one matrix product, and
+    each weighting's top 5 are found with argpartition instead of a sort.
+
+    Parameters
+    ----------
+    weights : dict or list
+        Dictionary with keys of stat columns and values of their weights, e.g.
+        {'PTS': 1, 'TRB': 1.2, 'AST': 1.5, 'STL': 3, 'BLK': 3, 'TOV': -1}, or
+        a list of such dictionaries. Columns a dictionary leaves out weigh 0
+    team : string, Optional
+        Name of team if only one team is desired, default=None
+    season : int, tuple or range, Optional
+        Season or (first, last) seasons to pick players from, default=None
+        uses every loaded season
+
+    Return
+    ------
+    players : dict
+        Dictionary with key of players and values of their weighted scores,
+        players who share a name are keyed by 'Name\\playerid'
+    points : list
+        List of players' average points per game
+    For a list of weights, a list of (players, points) tuples in the same
+    order, or (players, points, team) tuples when a team is given
+    """
+    many = isinstance(weights, (list, tuple))
+    weightings = list(weights) if many else [weights]
+    if not weightings:
+        return []
+    aggregates = player_aggregates(season)
+    columns = tuple(dict.fromkeys(col for weighting in weightings for col in weighting))
+    if 'PTS' not in columns:
+        columns += ('PTS',)
+    #One row of weights per weighting
+    weight_matrix = np.zeros((len(weightings), len(columns)))
+    for row, weighting in enumerate(weightings):
+        for stat, weight in weighting.items():
+            weight_matrix[row, columns.index(stat)] = weight
+
+    matrix = aggregates.matrix(columns)
+    rows = np.arange(len(matrix))
+    if team is not None:
+        rows = np.sort(aggregates.means.index.get_indexer(aggregates.rosters[team]))
+        matrix = matrix[rows]
+    #Scores of every player for every weighting, one weighting per row so
+    #argpartition runs along contiguous memory
+    scores = weight_matrix @ matrix.T
+    picks = min(5, len(rows))
+    if picks < len(rows):
+        best = np.argpartition(-scores, picks - 1, axis=1)[:, :picks]
+        #Players tied with the 5th best go to the first in 'Name\\id' order,
+        #which only needs fixing for the weightings that have such a tie
+        fifth = np.take_along_axis(scores, best, axis=1).min(axis=1)
+        for row in np.flatnonzero(np.count_nonzero(scores >= fifth[:, None], axis=1) > picks):
+            above = np.flatnonzero(scores[row] > fifth[row])
+            tied = np.flatnonzero(scores[row] == fifth[row])[:picks - len(above)]
+            best[row] = np.concatenate([above, tied])
+    else:
+        best = np.tile(np.arange(len(rows)), (len(weightings), 1))
+    #Order each weighting's top 5, breaking ties by 'Name\\id' order
+    best_scores = np.take_along_axis(scores, best, axis=1)
+    order = np.lexsort((best, -best_scores), axis=1)
+    best = np.take_along_axis(best, order, axis=1)
+    best_scores = np.take_along_axis(best_scores, order, axis=1).tolist()
+
+    ids = aggregates.means.index.to_numpy()[rows[best]].tolist()
+    points = matrix[:, columns.index('PTS')][best].tolist()
+    teams = []
+    for row, score in enumerate(best_scores):
+        players = dict(zip(aggregates.lineup_names(ids[row]), score))
+        teams.append((players, points[row]) if team is None else (players, points[row], team))
+    return teams if many else teams[0]
+
+
+def all_opponents(stat, season=None):
+    """Create a Team for every NBA team from its top 5 players for a given stat
+
+    Parameters
+    ----------
+    stat : string
+        The type of stat going to be compared
+    season : int, tuple or range, Optional
+        Season or (first, last) seasons to pick players from, default=None
+        uses every loaded season
+
+    Return
+    ------
+    opponents : dict
+        Dictionary with keys of team names and values of Team classes
+    """
+    rosters = player_aggregates(season).rosters
+    opponents = {}
+    for name, team in NBA_TEAMS.items():
+        if team in rosters:
+            players, points, code, player_ids = top_5(stat, team, season, ids=True)
+            opponents[name] = Team(players, points, code, player_ids, season)
+    return opponents
+
+
+def _assign_positions(values, eligible):
+    """Return the best way to fill each of POSITIONS with a different candidate
+
+    Solves the maximum weight matching of candidates to positions with a
+    dynamic program over which positions are filled, so it stays exact and
+    takes well under a millisecond for a few dozen candidates.
+
+    Parameters
+    ----------
+    values : list
+        List of each candidate's stat as floats, best ranked candidates first
+    eligible : list
+        List of sets of the positions each candidate can play
+
+    Return
+    ------
+    assignment : list
+        List of (candidate index, position) tuples in candidate order
+    """
+    #Best total and picks for every set of filled positions, as a bit mask
+    best = {0: (0.0, ())}
+    for index, (value, positions) in enumerate(zip(values, eligible)):
+        bits = [(1 << POSITIONS.index(pos), pos) for pos in POSITIONS if pos in positions]
+        for mask, (total, picks) in list(best.items()):
+            for bit, pos in bits:
+                if mask & bit:
+                    continue
+                option = (total + value, picks + ((index, pos),))
+                #Only strictly better totals replace, so ties keep better ranks
+                if mask | bit not in best or option[0] > best[mask | bit][0]:
+                    best[mask | bit] = option
+    #Fill as many positions as possible, then take the highest total
+    mask = max(best, key=lambda bits: (bin(bits).count('1'), best[bits][0]))
+    return sorted(best[mask][1])
+
+
+@timed('top_5_balanced')
+def top_5_balanced(stat, season=None, flexible=False, ids=False):
     """Return top 5 players' name, average stat, and points per game for a given stat.
     Also makes sure one of each position is on the team (No duplicates).
 
@@ -190,48 +1489,255 @@ def top_5_balanced(stat):
     ----------
     stat : string
         The type fo stat going to be compared
+    season : int, tuple or range, Optional
+        Season or (first, last) seasons to pick players from, default=None
+        uses every loaded season
+    flexible : bool, Optional
+        Whether players can fill any position they were listed at, e.g. a
+        'SF-PF' at SF or PF, instead of only their primary one. The five
+        positions are then assigned to get the highest total stat,
+        default=False
+    ids : bool, Optional
+        Whether to also return the players' ids last, default=False
 
     Return
     ------
     players : dict
-        Dictionary of players with values of their average stats per game and position
+        Dictionary of players with values of their average stats per game and position,
+        players who share a name are keyed by 'Name\\playerid'
     points : list
         List of players' average points per game
     """
     players = {}
     points = []
-    taken_pos = []
-    #Group and sort players together who were on multiple teams and have
-    #different statlines for each team
-    top = df.groupby('Player').mean().sort_values(stat, ascending=False)
-
-    counter = 0
-    #While loop that iterates through top until 5 players are added to players
-    while len(points) < 5:
-        #Gets position of player
-        pos = df[df['Player'].str.contains(top.index[counter].split('\\')[0],\
-                                           na=False)]['Pos'].iloc[0].split('-')[0]
-        #If position is not taken, player is added to team
-        if pos not in taken_pos:
-            #Edits name of player to take out player's tag
-            name = top.index[counter].split('\\')[0]
-            #Get average stat of player
-            spg = top[stat][counter]
-            #Get average points of player
-            ppg = top['PTS'][counter]
-            #Append player's stats and position to the players dictionary
-            players[name] = [spg, pos]
-            #Append player's points to the points list
-            points.append(ppg)
-            #Records position to not be taken again
-            taken_pos.append(pos)
-            counter += 1
-        else:
-            counter += 1
-    return players, points
+    aggregates = player_aggregates(season)
+    #Get players sorted by stat from the cached per-player averages
+    top = aggregates.ranked(stat)
+    if flexible:
+        #Only the best 5 at each position can be in the best assignment, since
+        #at most 4 of them are needed elsewhere
+        rankings = aggregates.eligible_ranked(stat)
+        candidates = sorted({rank for pos in POSITIONS for rank in rankings.get(pos, [])[:5]})
+        assignment = _assign_positions(
+            [top[stat].iloc[rank] for rank in candidates],
+            [aggregates.eligible[top.index[rank]] for rank in candidates])
+        leaders = [(candidates[index], pos) for index, pos in assignment]
+    else:
+        #Get the best player at each of POSITIONS, ordered by their overall
+        #ranking, players listed at other positions such as 'G' are left out
+        rankings = aggregates.position_ranked(stat)
+        leaders = sorted((rankings[pos][0], pos) for pos in POSITIONS if pos in rankings)
+    player_ids = [top.index[counter] for counter, _ in leaders]
+    #Get names of players from their player ids, players who share a name are
+    #kept apart by their 'Name\\playerid' label
+    names = aggregates.lineup_names(player_ids)
+    for (counter, pos), name in zip(leaders, names):
+        #Get average stat of player
+        spg = top[stat].iloc[counter]
+        #Get average points of player
+        ppg = top['PTS'].iloc[counter]
+        #Append player's stats and position to the players dictionary
+        players[name] = [spg, pos]
+        #Append player's points to the points list
+        points.append(ppg)
+    return (players, points, player_ids) if ids else (players, points)
+
+
+class LRUCache():
+    """Class that keeps the most recently used values of a bounded dictionary,
+    safe to share between threads
+
+    Parameters
+    ----------
+    maxsize : int
+        Most values kept before the least recently used is dropped
+    """
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
 
+    def get(self, key, build):
+        """Return the value of a key, building and keeping it on a miss
+
+        Parameters
+        ----------
+        key : tuple
+            Hashable key of the value
+        build : function
+            Function taking no arguments that returns the value. It runs
+            outside the lock, so two threads missing at once may both build
+
+        Return
+        ------
+        value : object
+            Cached or newly built value
+        """
+        with self._lock:
+            if key in self._values:
+                self.hits += 1
+                self._values.move_to_end(key)
+                return self._values[key]
+            self.misses += 1
+        value = build()
+        with self._lock:
+            self._values[key] = value
+            while len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+        return value
 
-def create_team(bal, stat, name):
+    def clear(self):
+        """Forget every value and the hit and miss counts"""
+        with self._lock:
+            self._values.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._values)
+
+    @property
+    def hit_ratio(self):
+        """Fraction of lookups that were hits, 0 before any lookup"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+#Superteams and opponents by (dataset key, seasons, kind, stat, mode or team)
+TEAM_CACHE = LRUCache(TEAM_CACHE_SIZE)
+register_gauge('team_cache_hit_ratio', lambda: TEAM_CACHE.hit_ratio)
+register_gauge('team_cache_size', lambda: len(TEAM_CACHE))
+
+
+def cached_team(kind, stat, choice, season, build):
+    """Return a Team from TEAM_CACHE, building it on a miss
+
+    Cached teams are shared by every caller, so their stat and point arrays
+    are made read-only, copy.copy() one to rename it.
+
+    Parameters
+    ----------
+    kind : string
+        Kind of team, e.g. 'superteam', 'opponent' or 'custom'
+    stat : string
+        Stat column the team is built for, e.g. 'PTS'
+    choice : object
+        Hashable choice that tells teams of a kind apart, e.g. 'Balanced', a
+        team abbreviation or a tuple of player ids
+    season : int, tuple or range
+        Season or (first, last) seasons the team is built from, None for
+        every loaded season
+    build : function
+        Function taking no arguments that returns the Team
+
+    Return
+    ------
+    team : Team
+        Cached or newly built Team
+    """
+    key = (player_aggregates(season).key, season_bounds(season), kind, stat, choice)
+
+    def build_frozen():
+        team = build()
+        team.stat_values.flags.writeable = False
+        team.point_values.flags.writeable = False
+        return team
+    return TEAM_CACHE.get(key, build_frozen)
+
+
+@timed('make_superteam')
+def make_superteam(bal, stat, name='', season=None):
+    """Return the SuperTeam create_team builds, without touching the module globals
+
+    Parameters
+    ----------
+    bal : string
+        'Balanced (One of Each Position)' or 'Unbalanced (Strictly Top Players)',
+        or a shortened form such as 'Balanced'
+    stat : string
+        User friendly stat to filter with, a key of STAT_NAMES
+    name : string, Optional
+        Team name, default='' keeps the SuperTeam default name
+    season : int, tuple or range, Optional
+        Season or (first, last) seasons to pick players from, default=None
+        uses every loaded season
+
+    Return
+    ------
+    team : SuperTeam
+        SuperTeam of the top 5 players for the stat
+    """
+    #If 'Balanced' was chosen, top_5_balanced should be run
+    if bal in 'Balanced (One of Each Position)':
+        mode, pick = 'Balanced', top_5_balanced
+    #If 'Unbalanced' was chosen, top_5 should be run
+    elif bal in 'Unbalanced (Strictly Top Players)':
+        mode, pick = 'Unbalanced', top_5
+    else:
+        raise ValueError('unknown team type: ' + repr(bal))
+    def build():
+        players, points, player_ids = pick(STAT_NAMES[stat], season=season, ids=True)
+        return SuperTeam(players, points, player_ids=player_ids, season=season)
+    team = cached_team('superteam', STAT_NAMES[stat], mode, season, build)
+    #Determine whether or not to assign Superteam a name, the cached
+    #arrays are shared with the renamed copy
+    if name == '':
+        return team
+    named = copy.copy(team)
+    named.team = name
+    return named
+
+
+@timed('make_opponent')
+def make_opponent(team, stat, season=None):
+    """Return the Team create_opponent builds, without touching the module globals
+
+    Parameters
+    ----------
+    team : string
+        A name from NBA_TEAMS or a team abbreviation
+    stat : string
+        User friendly stat to filter with, a key of STAT_NAMES
+    season : int, tuple or range, Optional
+        Season or (first, last) seasons to pick players from, default=None
+        uses every loaded season
+
+    Return
+    ------
+    opponent : Team
+        Team of the top 5 players of the NBA team for the stat
+    """
+    code = NBA_TEAMS.get(team, team)
+    def build():
+        players, points, _, player_ids = top_5(STAT_NAMES[stat], code, season, ids=True)
+        return Team(players, points, code, player_ids, season)
+    return cached_team('opponent', STAT_NAMES[stat], code, season, build)
+
+
+def warm_up(season=None):
+    """Build every default superteam and opponent into TEAM_CACHE
+
+    Parameters
+    ----------
+    season : int, tuple or range, Optional
+        Season or (first, last) seasons to build teams from, default=None
+        uses every loaded season
+
+    Return
+    ------
+    count : int
+        Number of teams in the cache afterwards
+    """
+    for stat in STAT_NAMES:
+        for mode in ('Balanced', 'Unbalanced'):
+            make_superteam(mode, stat, season=season)
+        for team in NBA_TEAMS:
+            make_opponent(team, stat, season)
+    return len(TEAM_CACHE)
+
+
+def create_team(bal, stat, name, season=None):
     """Run top_5 or top_5_balanced functions to create Superteam with given info
     Preparation for Tkinter GUI
 
@@ -243,107 +1749,118 @@ def create_team(bal, stat, name):
         String input from TKinter selection to determine which stat to filter with
     name : string
         String input from TKinter entry to make team name
+    season : int, tuple or range, Optional
+        Season or (first, last) seasons to pick players from, default=None
+        uses every loaded season
     """
     #Import global variables to be assigned and saved for later use
     global TEAM
     global CHOSEN_STAT
     #Record desired stat to use later
     CHOSEN_STAT = stat
-    #Create dictionary to translate stat
-    desired_stat = {'Points': 'PTS',
-                    'Assists': 'AST',
-                    'Rebounds': 'TRB',
-                    'Steals': 'STL',
-                    'Blocks': 'BLK'}
-    #Determine whether or not to assign Superteam a name
-    if name == '':
-        #If 'Balanced' was chosen, top_5_balanced should be run
-        if bal in 'Balanced (One of Each Position)':
-            #Determine which stat to use to filter
-            balanced = top_5_balanced(desired_stat[stat])
-            TEAM = SuperTeam(balanced[0], balanced[1])
-        #If 'Unbalanced' was chosen, top_5 should be run
-        elif bal in 'Unbalanced (Strictly Top Players)':
-            #Determine which stat to use to filter
-            unbalanced = top_5(desired_stat[stat])
-            TEAM = SuperTeam(unbalanced[0], unbalanced[1])
-    else:
-        #If 'Balanced' was chosen, top_5_balanced should be run
-        if bal in 'Balanced (One of Each Position)':
-            #Determine which stat to use to filter
-            balanced = top_5_balanced(desired_stat[stat])
-            TEAM = SuperTeam(balanced[0], balanced[1], name)
-        #If 'Unbalanced' was chosen, top_5 should be run
-        elif bal in 'Unbalanced (Strictly Top Players)':
-            #determine which stat to use to filter
-            unbalanced = top_5(desired_stat[stat])
-            TEAM = SuperTeam(unbalanced[0], unbalanced[1], name)
-    #Return confirmation messages for user
-    return '\nGreat! You are responsible for the team: ' + TEAM.team + '.\nThe players'+\
+    TEAM = make_superteam(bal, stat, name, season)
+    return team_message(TEAM, stat)
+
+
+def team_message(team, stat):
+    """Return the confirmation message for a newly made SuperTeam"""
+    return '\nGreat! You are responsible for the team: ' + team.team + '.\nThe players'+\
         ' that had the best ' + stat + ' and who are on your team are: '\
-          + str(list(TEAM.players.keys()))
+          + str(list(team.players.keys()))
 
 
-def create_opponent(team):
+def create_opponent(team, season=None):
     """Function to run top_5 with given information.
     Preparation for TKinter GUI
 
     Parameters
     ----------
     team : string
-        String of desired team to filter through
+        String of desired team to filter through, a name from NBA_TEAMS or a
+        team abbreviation (e.g. for teams of past seasons)
+    season : int, tuple or range, Optional
+        Season or (first, last) seasons to pick players from, default=None
+        uses every loaded season
     chosen_stat : string
         Global string of stat to filter with
     """
     #Import global variables to assign and save for later use
     global OPPONENT
     global CHOSEN_STAT
-    #Create dictionary to convert user friendly string to dataframe string
-    nba_dict = {'Atlanta Hawks': 'ATL',
-                'Boston Celtics': 'BOS',
-                'Brooklyn Nets': 'BRK',
-                'Charlotte Hornets': 'CHO',
-                'Chicago Bulls': 'CHI',
-                'Cleveland Cavaliers': 'CLE',
-                'Dallas Mavericks': 'DAL',
-                'Denver Nuggets': 'DEN',
-                'Detroit Pistons': 'DET',
-                'Golden State Warriors': 'GSW',
-                'Houston Rockets': 'HOU',
-                'Indiana Pacers': 'IND',
-                'Los Angeles Clippers': 'LAC',
-                'Los Angeles Lakers': 'LAL',
-                'Memphis Grizzlies': 'MEM',
-                'Miami Heat': 'MIA',
-                'Milwaukee Bucks': 'MIL',
-                'Minnesota Timberwolves': 'MIN',
-                'New Orleans Pelicans': 'NOP',
-                'New York Knicks': 'NYK',
-                'Oklahoma City Thunder': 'OKC',
-                'Orlando Magic': 'ORL',
-                'Philadelphia 76ers': 'PHI',
-                'Phoenix Suns': 'PHO',
-                'Portland Trail Blazers': 'POR',
-                'Sacramento Kings': 'SAC',
-                'San Antonio Spurs': 'SAS',
-                'Toronto Raptors': 'TOR',
-                'Utah Jazz': 'UTA',
-                'Washington Wizards': 'WAS'}
-    #Create dictionary to convert user friendly string to dataframe string
-    stat_dict = {'Points': 'PTS',
-                 'Assists': 'AST',
-                 'Rebounds': 'TRB',
-                 'Steals': 'STL',
-                 'Blocks': 'BLK'}
-    #Create new team with top_5 function
-    new_team = top_5(stat_dict[CHOSEN_STAT], nba_dict[team])
-    #Create new Team class with attributes of new_team
-    OPPONENT = Team(new_team[0], new_team[1], new_team[2])
-    return "\nThe " + team + "'s players with the best " + CHOSEN_STAT + " are: "\
-        + str(list(OPPONENT.players.keys()))
-
-
-def play_game():
+    #Create new Team class with the top 5 players for the chosen stat
+    OPPONENT = make_opponent(team, CHOSEN_STAT, season)
+    return opponent_message(OPPONENT, team, CHOSEN_STAT)
+
+
+def opponent_message(opponent, team, stat):
+    """Return the message listing the players of a newly made opponent"""
+    return "\nThe " + team + "'s players with the best " + stat + " are: "\
+        + str(list(opponent.players.keys()))
+
+
+def game_result(team, opponent, chosen_stat, rng=None):
+    """Simulate a game between a Superteam and an NBA team and describe it
+
+    Parameters
+    ----------
+    team : SuperTeam
+        Superteam class
+    opponent : Team
+        Team class
+    chosen_stat : string
+        User friendly stat the teams were made with, a key of STAT_NAMES
+    rng : numpy.random.Generator or int, Optional
+        Generator or seed for the game, default=None uses the global random
+        module like the GUI always has
+
+    Return
+    ------
+    result : dict
+        Dictionary with 'team_points', 'opponent_points', 'team_stat' and
+        'opponent_stat' (None for 'Points') and 'lines', the messages
+        play_game() prints
+    """
+    #Every draw of the game comes from one stream
+    rng = None if rng is None else np.random.default_rng(rng)
+    #Generate simulation of each team scoring points
+    team_pts = team.points(rng)
+    oppo_pts = opponent.points(rng)
+    #What to print if Superteam wins
+    if team_pts > oppo_pts:
+        lines = ['With a final score of ' + str(team_pts) + ' to ' + str(oppo_pts)\
+                 + ', ' + team.team + ' beat ' + opponent.team + ' by ' +\
+                     str(team_pts-oppo_pts) + ' points.']
+    #What to print if Team wins
+    elif oppo_pts > team_pts:
+        lines = ['With a final score of ' + str(oppo_pts) + ' to ' + str(team_pts)\
+                 + ', ' + opponent.team + ' beat ' + team.team + ' by ' +\
+                     str(oppo_pts-team_pts) + ' points.']
+    #What to print if there's a tie
+    else:
+        lines = ['The game ended in a tie with a score of ' + str(team_pts) +\
+                 ' to ' + str(oppo_pts) + '.']
+    team_stats = oppo_stats = None
+    #Points games don't need a second line to show how many of the specified
+    #stat each team generated
+    if chosen_stat != 'Points':
+        #Generate simulation of each team's amount of the chosen stat
+        team_stats = team.stat(rng)
+        oppo_stats = opponent.stat(rng)
+        #The team that won, or the Superteam after a tie, is listed first
+        first, second = (team, opponent) if team_pts >= oppo_pts else (opponent, team)
+        first_stats, second_stats = (team_stats, oppo_stats) if first is team \
+            else (oppo_stats, team_stats)
+        lines.append('Also, ' + first.team + ' had ' + str(first_stats) + ' ' + chosen_stat\
+                     + ' and ' + second.team + ' had ' + str(second_stats) + ' ' +\
+                         chosen_stat + '.')
+    return {'team_points': team_pts,
+            'opponent_points': oppo_pts,
+            'team_stat': team_stats,
+            'opponent_stat': oppo_stats,
+            'lines': lines}
+
+
+def play_game(rng=None):
     """Simulate game between Superteam and chosen NBA team
 
     Parameters
@@ -352,65 +1869,18 @@ def play_game():
         Superteam class
     opponent : class
         Team class
+    rng : numpy.random.Generator or int, Optional
+        Generator or seed for the game, default=None uses the global random
+        module
 
     Return
     ------
     Printed messages of simulated scores and who won
     """
-    #Generate simulation of each team scoring points
-    team_pts = TEAM.points()
-    oppo_pts = OPPONENT.points()
-    #Printed statements that don't need to print out a second line for Points
-    if CHOSEN_STAT == 'Points':
-        #What to print if Superteam wins
-        if team_pts > oppo_pts:
-            print('')
-            print('With a final score of ' + str(team_pts) + ' to ' + str(oppo_pts)\
-                  + ', ' + TEAM.team + ' beat ' + OPPONENT.team + ' by ' +\
-                      str(team_pts-oppo_pts) + ' points.')
-        #What to print if Team wins
-        elif oppo_pts > team_pts:
-            print('')
-            print('With a final score of ' + str(oppo_pts) + ' to ' + str(team_pts)\
-                  + ', ' + OPPONENT.team + ' beat ' + TEAM.team + ' by ' +\
-                      str(oppo_pts-team_pts) + ' points.')
-        #What to print if there's a tie
-        else:
-            print('')
-            print('The game ended in a tie with a score of ' + str(team_pts) +\
-                  ' to ' + str(oppo_pts) + '.')
-    #Printed statements that need to print out a second line to show how many
-    #of the specified stat each team generated
-    else:
-        #Generate simulation of each team's amount of the chosen stat
-        team_stats = TEAM.stat()
-        oppo_stats = OPPONENT.stat()
-        #What to print if Superteam wins
-        if team_pts > oppo_pts:
-            print('')
-            print('With a final score of ' + str(team_pts) + ' to ' + str(oppo_pts)\
-                  + ', ' + TEAM.team + ' beat ' + OPPONENT.team + ' by ' +\
-                      str(team_pts-oppo_pts) + ' points.')
-            print('Also, ' + TEAM.team + ' had ' + str(team_stats) + ' ' + CHOSEN_STAT\
-                  + ' and ' + OPPONENT.team + ' had ' + str(oppo_stats) + ' ' +\
-                      CHOSEN_STAT + '.')
-        #What to print if Team wins
-        elif oppo_pts > team_pts:
-            print('')
-            print('With a final score of ' + str(oppo_pts) + ' to ' + str(team_pts)\
-                  + ', ' + OPPONENT.team + ' beat ' + TEAM.team + ' by ' +\
-                      str(oppo_pts-team_pts) + ' points.')
-            print('Also, ' + OPPONENT.team + ' had ' + str(oppo_stats) + ' ' +\
-                  CHOSEN_STAT + ' and ' + TEAM.team + ' had ' + str(team_stats)\
-                      + ' ' + CHOSEN_STAT + '.')
-        #What to print if there's a tie
-        else:
-            print('')
-            print('The game ended in a tie with a score of ' + str(team_pts) +\
-                  ' to ' + str(oppo_pts) + '.')
-            print('Also, ' + TEAM.team + ' had ' + str(team_stats) + ' ' + CHOSEN_STAT\
-                  + ' and ' + OPPONENT.team + ' had ' + str(oppo_stats) + ' ' +\
-                      CHOSEN_STAT + '.')
+    result = game_result(TEAM, OPPONENT, CHOSEN_STAT, rng)
+    print('')
+    for line in result['lines']:
+        print(line)
 
 
 def final_path(option):
@@ -440,6 +1910,8 @@ def build_team():
     print('If desired, type in the teamname you want as well :)')
     input("Press Enter to continue.")
 
+    import tkinter as tk
+
     #Create GUI interface for selecting options for Superteam with TKinter module
     options = tk.Tk()
     #Create title for window
@@ -0,0 +1,96 @@
+"""Functions for simulating a team against the whole league without the GUI."""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+
+from .functions import all_opponents
+from .metrics import timed
+
+#Columns of the table returned by round_robin
+ROUND_ROBIN_COLUMNS = ['opponent', 'team', 'win_prob', 'tie_prob', 'loss_prob',
+                       'mean_margin', 'mean_points', 'mean_opponent_points']
+
+
+def play_matchup(name, team, opponent, n_games, seed=None):
+    """Simulate a Team against one opponent and return only the summary
+
+    The summary is one row of the round_robin table. The arguments and the
+    summary are small and picklable, so matchups can run in worker processes.
+
+    Parameters
+    ----------
+    name : string
+        Name of the opponent put in the summary
+    team : Team
+        Team to simulate, usually a SuperTeam
+    opponent : Team
+        Team it plays
+    n_games : int
+        Number of games to simulate
+    seed : int or numpy.random.SeedSequence, Optional
+        Seed of the matchup's random stream, default=None uses fresh entropy
+
+    Return
+    ------
+    summary : dict
+        Dictionary with keys of ROUND_ROBIN_COLUMNS
+    """
+    results = team.simulate(n_games, opponent, rng=np.random.default_rng(seed))
+    #Score arrays stay in the worker, only the summary is sent back
+    return {'opponent': name,
+            'team': opponent.team,
+            'win_prob': results['win_prob'],
+            'tie_prob': results['tie_prob'],
+            'loss_prob': results['loss_prob'],
+            'mean_margin': results['mean_margin'],
+            'mean_points': results['mean_points'],
+            'mean_opponent_points': float(results['opponent_points'].mean())}
+
+
+@timed('round_robin')
+def round_robin(team, stat, n_games=10000, seed=None, workers=None, season=None):
+    """Simulate a Team against the top 5 players of every NBA team for a stat
+
+    Every matchup gets its own random stream spawned from seed, so a given
+    seed gives the same table no matter how many workers are used.
+
+    Parameters
+    ----------
+    team : Team
+        Team to simulate, usually a SuperTeam
+    stat : string
+        The type of stat the opponents are built from, e.g. 'PTS'
+    n_games : int, Optional
+        Number of games simulated against each opponent, default=10000
+    seed : int, Optional
+        Seed for the simulation, default=None uses fresh entropy
+    workers : int, Optional
+        Number of worker processes, default=None uses every core and 1 runs
+        every matchup in this process
+    season : int, tuple or range, Optional
+        Season or (first, last) seasons to build opponents from, default=None
+        uses every loaded season
+
+    Return
+    ------
+    table : DataFrame
+        DataFrame with one row per opponent, ranked from the best matchup for
+        team to the worst
+    """
+    import pandas as pd
+
+    opponents = all_opponents(stat, season)
+    seeds = np.random.SeedSequence(seed).spawn(len(opponents))
+    args = (list(opponents), repeat(team), list(opponents.values()), repeat(n_games), seeds)
+
+    if workers == 1:
+        rows = list(map(play_matchup, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = list(pool.map(play_matchup, *args))
+
+    table = pd.DataFrame(rows, columns=ROUND_ROBIN_COLUMNS)
+    table = table.sort_values(['win_prob', 'mean_margin'], ascending=False, kind='mergesort')
+    return table.reset_index(drop=True)
@@ -0,0 +1,197 @@
+"""Functions for timing and counting the stages of the Superteam pipeline.
+
+Metrics are off unless the NBA_METRICS environment variable is set or
+enable() is called. While off, timed functions only check one flag, and
+timer() and count() return straight away.
+"""
+
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+#Whether timers and counters record anything
+ENABLED = os.environ.get('NBA_METRICS', '') not in ('', '0')
+
+#Timer name to [calls, total seconds, longest call in seconds]
+_TIMERS = {}
+#Counter name to count
+_COUNTERS = {}
+#Gauge name to function returning its current value, e.g. cache sizes
+_GAUGES = {}
+_LOCK = threading.Lock()
+_NULL = contextlib.nullcontext()
+
+
+def enable(on=True):
+    """Turn recording metrics on or off
+
+    Parameters
+    ----------
+    on : bool, Optional
+        Whether to record metrics, default=True
+    """
+    global ENABLED
+    ENABLED = on
+
+
+def reset_metrics():
+    """Forget every recorded timing and count"""
+    with _LOCK:
+        _TIMERS.clear()
+        _COUNTERS.clear()
+
+
+def _record(name, seconds):
+    """Add one call of a timer"""
+    with _LOCK:
+        stats = _TIMERS.get(name)
+        if stats is None:
+            _TIMERS[name] = [1, seconds, seconds]
+        else:
+            stats[0] += 1
+            stats[1] += seconds
+            if seconds > stats[2]:
+                stats[2] = seconds
+
+
+def count(name, amount=1):
+    """Add to a counter
+
+    Parameters
+    ----------
+    name : string
+        Name of the counter, e.g. 'aggregates_cache_hit'
+    amount : int, Optional
+        Amount to add, default=1
+    """
+    if ENABLED:
+        with _LOCK:
+            _COUNTERS[name] = _COUNTERS.get(name, 0) + amount
+
+
+class _Timer():
+    """Context manager that records the time spent in a block"""
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _record(self.name, time.perf_counter() - self.start)
+
+
+def timer(name):
+    """Return a context manager timing a block under a name
+
+    Parameters
+    ----------
+    name : string
+        Name of the timer, e.g. 'parse_csv'
+
+    Return
+    ------
+    context : context manager
+        Records the block's time when metrics are on, does nothing otherwise
+    """
+    return _Timer(name) if ENABLED else _NULL
+
+
+def timed(name):
+    """Return a decorator that times every call of a function under a name
+
+    Parameters
+    ----------
+    name : string
+        Name of the timer
+
+    Return
+    ------
+    decorator : function
+        Decorator wrapping a function with the timer
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def register_gauge(name, value):
+    """Report a value computed when metrics are read, e.g. a cache's size
+
+    Parameters
+    ----------
+    name : string
+        Name of the gauge
+    value : function
+        Function taking no arguments that returns a number
+    """
+    _GAUGES[name] = value
+
+
+def get_metrics():
+    """Return every timer, counter and gauge
+
+    Return
+    ------
+    metrics : dict
+        Dictionary with 'enabled', 'timers' (name to a dictionary of 'count',
+        'total', 'mean' and 'max' seconds), 'counters' and 'gauges'
+    """
+    with _LOCK:
+        timers = {name: {'count': calls, 'total': total, 'mean': total / calls, 'max': longest}
+                  for name, (calls, total, longest) in sorted(_TIMERS.items())}
+        counters = dict(sorted(_COUNTERS.items()))
+    gauges = {name: value() for name, value in sorted(_GAUGES.items())}
+    return {'enabled': ENABLED, 'timers': timers, 'counters': counters, 'gauges': gauges}
+
+
+def metrics_json(indent=None):
+    """Return get_metrics() as a JSON string"""
+    return json.dumps(get_metrics(), indent=indent)
+
+
+def metrics_prometheus(prefix='nba_'):
+    """Return get_metrics() in the Prometheus text exposition format
+
+    Parameters
+    ----------
+    prefix : string, Optional
+        Prefix of every metric name, default='nba_'
+
+    Return
+    ------
+    text : string
+        Timers as a summary of seconds per stage, counters as one counter
+        labeled by event and gauges as one gauge labeled by name
+    """
+    metrics = get_metrics()
+    lines = ['# TYPE ' + prefix + 'stage_seconds summary']
+    for name, stats in metrics['timers'].items():
+        label = '{stage="' + name + '"}'
+        lines.append(prefix + 'stage_seconds_count' + label + ' ' + str(stats['count']))
+        lines.append(prefix + 'stage_seconds_sum' + label + ' ' + repr(stats['total']))
+    lines.append('# TYPE ' + prefix + 'stage_seconds_max gauge')
+    for name, stats in metrics['timers'].items():
+        lines.append(prefix + 'stage_seconds_max{stage="' + name + '"} ' + repr(stats['max']))
+    lines.append('# TYPE ' + prefix + 'events_total counter')
+    for name, value in metrics['counters'].items():
+        lines.append(prefix + 'events_total{event="' + name + '"} ' + str(value))
+    lines.append('# TYPE ' + prefix + 'gauge gauge')
+    for name, value in metrics['gauges'].items():
+        lines.append(prefix + 'gauge{name="' + name + '"} ' + str(value))
+    return '\n'.join(lines) + '\n'
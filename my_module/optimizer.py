@@ -0,0 +1,249 @@
+"""Functions for searching for the best 5 player lineup with branch and bound."""
+
+import heapq
+import time
+
+import numpy as np
+
+from .functions import SuperTeam, POINT_SPREAD, POSITIONS, STAT_SPREAD, player_aggregates
+from .distribution import RESOLUTION, total_distribution
+from .metrics import count, timed
+
+#Nodes expanded before optimize_lineup gives back the best lineup so far
+NODE_BUDGET = 20000
+
+
+class _PlayerPool():
+    """Class that stores every candidate's contribution vector, sorted by the first entry
+
+    Parameters
+    ----------
+    aggregates : PlayerAggregates
+        Per-player averages to pick from
+    contributions : numpy.ndarray
+        Array of shape (players, d) with each player's contribution vector in
+        aggregates.means order. Goals never get worse when an entry grows
+    """
+    def __init__(self, aggregates, contributions):
+        order = np.argsort(-contributions[:, 0], kind='stable')
+        self.ids = aggregates.means.index.to_numpy()[order]
+        self.contributions = contributions[order]
+        self.positions = [aggregates.positions[plyr] for plyr in self.ids]
+        count, dims = self.contributions.shape
+
+        #Best 5 values of every entry among candidates at or after each index
+        self.suffix_top = np.full((count + 1, 5, dims), -np.inf)
+        #Best value of every entry and first candidate for each position at or
+        #after each index
+        self.suffix_pos = {pos: np.full((count + 1, dims), -np.inf) for pos in POSITIONS}
+        self.next_at = {pos: np.full(count + 1, count) for pos in POSITIONS}
+        for index in range(count - 1, -1, -1):
+            merged = np.vstack([self.suffix_top[index + 1], self.contributions[index]])
+            self.suffix_top[index] = -np.sort(-merged, axis=0)[:5]
+            for pos in POSITIONS:
+                self.suffix_pos[pos][index] = self.suffix_pos[pos][index + 1]
+                self.next_at[pos][index] = self.next_at[pos][index + 1]
+            pos = self.positions[index]
+            if pos in self.suffix_pos:
+                self.suffix_pos[pos][index] = np.maximum(self.suffix_pos[pos][index],
+                                                         self.contributions[index])
+                self.next_at[pos][index] = index
+
+    def optimistic(self, start, chosen, balanced):
+        """Return contribution vectors of the chosen players plus an optimistic fill
+
+        Every open slot gets the best remaining value of each entry on its
+        own, so no lineup below this node can do better. Returns None when
+        the lineup can't be filled.
+        """
+        rows = [self.contributions[index] for index in chosen]
+        if not balanced:
+            fill = self.suffix_top[start, :5 - len(chosen)]
+            if np.isinf(fill).any():
+                return None
+            return np.vstack(rows + [fill]) if rows else fill
+        taken = {self.positions[index] for index in chosen}
+        for pos in POSITIONS:
+            if pos not in taken:
+                if self.next_at[pos][start] == len(self.ids):
+                    return None
+                rows.append(self.suffix_pos[pos][start])
+        return np.vstack(rows)
+
+    def greedy(self, balanced):
+        """Return the lineup taking the best first entry at every open slot"""
+        if not balanced:
+            return tuple(range(5))
+        return tuple(sorted(int(self.next_at[pos][0]) for pos in POSITIONS))
+
+    def next_open(self, start, chosen, balanced):
+        """Return the first candidate at or after start that could join the lineup"""
+        if not balanced:
+            return start
+        taken = {self.positions[index] for index in chosen}
+        open_next = [self.next_at[pos][start] for pos in POSITIONS if pos not in taken]
+        return min(open_next) if open_next else start
+
+
+def _win_chance(oppo_means, spread, resolution):
+    """Return function giving the chance a team's total beats an opponent's total"""
+    oppo_totals, oppo_probs = total_distribution(oppo_means, spread, resolution)
+    #Probability the opponent's total is less than each total
+    below = np.concatenate([[0.0], np.cumsum(oppo_probs)])
+
+    def chance(means):
+        totals, probs = total_distribution(sorted(means), spread, resolution)
+        return float(probs @ below[np.clip(totals - oppo_totals[0], 0, len(oppo_probs))])
+    return chance
+
+
+def lineup_goal(weights=None, opponent=None, stat=None, resolution=RESOLUTION):
+    """Return the columns and value function of a lineup goal
+
+    Parameters
+    ----------
+    weights : dict, Optional
+        Dictionary of stat to weight for a weighted stat total goal,
+        default=None uses {'PTS': 1} when there is no opponent
+    opponent : Team, Optional
+        Team to maximize the chance of beating in points, default=None
+    stat : string, Optional
+        With an opponent, also require out-doing them in this stat (the
+        second line play_game() prints), default=None
+    resolution : int, Optional
+        Grid cells per point for win probabilities, default=RESOLUTION
+
+    Return
+    ------
+    columns : list
+        Columns of the player averages each contribution vector is built from
+    value : function
+        Function taking a (5, d) array of contribution vectors and returning
+        the goal's value
+    weights : numpy.ndarray or None
+        Weight of each column for a weighted stat total goal
+    """
+    if opponent is None:
+        weights = {'PTS': 1} if weights is None else weights
+        return list(weights), lambda matrix: float(matrix[:, 0].sum()), \
+            np.array(list(weights.values()), dtype=float)
+    win_points = _win_chance(opponent.point, POINT_SPREAD, resolution)
+    if stat is None:
+        return ['PTS'], lambda matrix: win_points(matrix[:, 0]), None
+    #Points and stats are drawn independently, so the chances multiply
+    win_stat = _win_chance(opponent.stat_means(), STAT_SPREAD, resolution)
+    return ['PTS', stat], lambda matrix: win_points(matrix[:, 0]) * win_stat(matrix[:, 1]), None
+
+
+@timed('optimize_lineup')
+def optimize_lineup(weights=None, opponent=None, stat=None, balanced=False, season=None,
+                    node_budget=NODE_BUDGET, time_budget=None, resolution=RESOLUTION):
+    """Search every 5 player lineup for the one that best meets a goal
+
+    The goal is a weighted total of average stats, or with an opponent the
+    exact chance of outscoring them (and optionally out-doing them in a
+    stat). Nodes are expanded best bound first and pruned with optimistic
+    bounds, and the search stops early when the node or time budget runs
+    out.
+
+    Parameters
+    ----------
+    weights : dict, Optional
+        Dictionary of stat to weight, e.g. {'PTS': 1, 'TRB': 1.2},
+        default=None uses {'PTS': 1} when there is no opponent
+    opponent : Team, Optional
+        Team to maximize the chance of beating, default=None
+    stat : string, Optional
+        With an opponent, also require out-doing them in this stat,
+        default=None
+    balanced : bool, Optional
+        Whether the lineup needs one player of each primary position,
+        default=False
+    season : int, tuple or range, Optional
+        Season or (first, last) seasons to pick players from, default=None
+        uses every loaded season
+    node_budget : int, Optional
+        Most search nodes to expand, default=NODE_BUDGET
+    time_budget : float, Optional
+        Most seconds to search, default=None has no time limit
+    resolution : int, Optional
+        Grid cells per point for win probabilities, default=RESOLUTION
+
+    Return
+    ------
+    result : dict
+        Dictionary with 'team' (SuperTeam of the lineup), 'player_ids',
+        'value' of the lineup, 'bound' on the best possible value, 'gap'
+        between them, 'nodes' expanded and 'complete' (whether the search
+        proved no lineup is better)
+    """
+    columns, value, column_weights = lineup_goal(weights, opponent, stat, resolution)
+    aggregates = player_aggregates(season)
+    unknown = [col for col in columns if col not in aggregates.means.columns]
+    if unknown:
+        raise ValueError('unknown stats: ' + str(unknown))
+    contributions = aggregates.means[columns].to_numpy(dtype=float)
+    if column_weights is not None:
+        contributions = (contributions @ column_weights)[:, None]
+    pool = _PlayerPool(aggregates, contributions)
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+
+    root = pool.optimistic(0, (), balanced)
+    if root is None:
+        raise ValueError('not enough players to fill a lineup')
+    #Start from the greedy lineup so running out of budget still gives one back
+    best = pool.greedy(balanced)
+    best_value = value(pool.contributions[list(best)])
+    #Heap of (-bound, tie breaker, next candidate, chosen candidates)
+    heap = [(-value(root), 0, pool.next_open(0, (), balanced), ())]
+    counter = 1
+    nodes = 0
+    while heap and -heap[0][0] > best_value:
+        if nodes >= node_budget or (deadline is not None and time.perf_counter() > deadline):
+            break
+        _, _, start, chosen = heapq.heappop(heap)
+        nodes += 1
+        taken = {pool.positions[index] for index in chosen}
+        children = []
+        #Either take the next candidate, when their position is one of
+        #POSITIONS and still open
+        if not balanced or (pool.positions[start] in POSITIONS and
+                            pool.positions[start] not in taken):
+            children.append(chosen + (start,))
+        #Or leave them out of the lineup
+        children.append(chosen)
+        for child in children:
+            if len(child) == 5:
+                lineup_value = value(pool.contributions[list(child)])
+                if lineup_value > best_value:
+                    best, best_value = child, lineup_value
+                continue
+            child_start = pool.next_open(start + 1, child, balanced)
+            optimistic = pool.optimistic(child_start, child, balanced)
+            if optimistic is None:
+                continue
+            bound = value(optimistic)
+            if bound > best_value:
+                heapq.heappush(heap, (-bound, counter, child_start, child))
+                counter += 1
+
+    count('optimizer_nodes', nodes)
+    bound = max(best_value, -heap[0][0]) if heap else best_value
+    players = {}
+    points = []
+    means = aggregates.means
+    player_ids = [pool.ids[index] for index in best]
+    #Players who share a name are kept apart by their 'Name\\playerid' label
+    names = aggregates.lineup_names(player_ids)
+    for index, plyr, name in zip(best, player_ids, names):
+        spg = float(pool.contributions[index, 0]) if column_weights is not None \
+            else float(means.loc[plyr, columns[-1]])
+        players[name] = [spg, pool.positions[index]] if balanced else spg
+        points.append(means.loc[plyr, 'PTS'])
+    return {'team': SuperTeam(players, points, player_ids=player_ids, season=season),
+            'player_ids': player_ids,
+            'value': best_value,
+            'bound': bound,
+            'gap': bound - best_value,
+            'nodes': nodes,
+            'complete': bound <= best_value}
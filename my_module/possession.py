@@ -0,0 +1,217 @@
+"""Functions for simulating games possession by possession from shooting rates.
+
+A team's five players use possessions at their per game rates: each two
+point attempt, three point attempt, trip to the line (two free throws) and
+turnover is one possession. Every game draws its number of possessions,
+then every possession draws who ends it and how, and shots go in at the
+player's percentages. Games are one array axis and possessions the other,
+so thousands of games are drawn at once.
+
+Made shots are worth 2 * (FG - 3P) + 3 * 3P + FT on average, which is the
+player's PTS, so the engine scores like the triangular model on average
+with the spread coming from the shooting instead of a fixed +/- 15.
+"""
+
+import numpy as np
+
+from .functions import SeasonCache, player_aggregates, season_bounds
+
+#Ways a possession can end, per player
+OUTCOMES = ('2PA', '3PA', 'FT', 'TOV')
+#Points of a make for each outcome, a free throw trip scores per free throw
+POINTS_PER_MAKE = np.array([2, 3, 1, 0])
+#Games drawn at a time, fewer than functions.CHUNK_GAMES since every game is
+#a row of up to a few hundred possession draws
+CHUNK_GAMES = 20000
+
+_MODELS = SeasonCache('possession_model')
+
+
+def _alias_table(probs):
+    """Return Walker's alias table of a discrete distribution
+
+    A category drawn as k = floor(u * K), kept when a second uniform is
+    below keep[k] and swapped for alias[k] otherwise, has the distribution
+    probs, with two lookups per draw instead of a binary search.
+
+    Parameters
+    ----------
+    probs : numpy.ndarray
+        Probabilities of the K categories
+
+    Return
+    ------
+    keep : numpy.ndarray
+        Chance of keeping each slot's own category
+    alias : numpy.ndarray
+        Category each slot is swapped for
+    """
+    size = len(probs)
+    scaled = np.asarray(probs, dtype=np.float64) * size
+    keep = np.ones(size)
+    alias = np.arange(size)
+    small = [k for k in range(size) if scaled[k] < 1]
+    large = [k for k in range(size) if scaled[k] >= 1]
+    while small and large:
+        low, high = small.pop(), large.pop()
+        keep[low] = scaled[low]
+        alias[low] = high
+        scaled[high] -= 1 - scaled[low]
+        (small if scaled[high] < 1 else large).append(high)
+    return keep, alias
+
+
+class PossessionModel():
+    """Class that stores every player's per game possession and shooting rates
+
+    Parameters
+    ----------
+    aggregates : PlayerAggregates
+        Per-player averages the model is built from
+    """
+    def __init__(self, aggregates):
+        self.aggregates = aggregates
+        means = aggregates.means
+        self.index = {plyr: row for row, plyr in enumerate(means.index)}
+        two_att = (means['FGA'] - means['3PA']).clip(lower=0).to_numpy()
+        two_made = (means['FG'] - means['3P']).clip(lower=0).to_numpy()
+        three_att = means['3PA'].to_numpy()
+        free_att = means['FTA'].to_numpy()
+        #Possessions each player ends per game, in OUTCOMES order
+        self.rates = np.column_stack([two_att, three_att, free_att / 2,
+                                      means['TOV'].to_numpy()]).astype(np.float64)
+
+        def pct(made, att):
+            return np.divide(made, att, out=np.zeros_like(att, dtype=np.float64), where=att > 0)
+        #Chance each kind of shot goes in, turnovers never score
+        self.makes = np.column_stack([pct(two_made, two_att),
+                                      pct(means['3P'].to_numpy(), three_att),
+                                      pct(means['FT'].to_numpy(), free_att),
+                                      np.zeros(len(means))])
+
+    def simulate(self, player_ids, n_games, rng=None):
+        """Simulate games of a lineup possession by possession
+
+        Parameters
+        ----------
+        player_ids : list
+            Player ids of the lineup
+        n_games : int
+            Number of games to simulate
+        rng : numpy.random.Generator or int, Optional
+            Generator or seed for the draws, default=None uses fresh entropy
+
+        Return
+        ------
+        results : dict
+            Dictionary of int64 arrays of length n_games: 'points',
+            'possessions', 'FGA', 'FGM', '3PA', '3PM', 'FTA', 'FTM', 'TOV', and
+            'player_points' of shape (n_games, players)
+        """
+        if n_games < 1:
+            raise ValueError('n_games must be at least 1')
+        rng = np.random.default_rng(rng)
+        rows = [self.index[plyr] for plyr in player_ids]
+        #Flatten (player, outcome) into one category per possession ending
+        rates = self.rates[rows].ravel()
+        makes = self.makes[rows].ravel()
+        kinds = np.tile(np.arange(len(OUTCOMES), dtype=np.int8), len(rows))
+        players = np.repeat(np.arange(len(rows)), len(OUTCOMES))
+        total_rate = rates.sum()
+        if total_rate <= 0:
+            raise ValueError('lineup has no possessions to simulate')
+        keep, alias = _alias_table(rates / total_rate)
+        #Small dtypes keep the (games, possessions) arrays cheap to pass over
+        keep = keep.astype(np.float32)
+        alias = alias.astype(np.int8)
+        makes = makes.astype(np.float32)
+        names = ('points', 'possessions', 'FGA', 'FGM', '3PA', '3PM', 'FTA', 'FTM', 'TOV')
+        results = {name: np.empty(n_games, dtype=np.int64) for name in names}
+        results['player_points'] = np.empty((n_games, len(rows)), dtype=np.int64)
+
+        for start in range(0, n_games, CHUNK_GAMES):
+            games = min(CHUNK_GAMES, n_games - start)
+            stop = start + games
+            counts = rng.poisson(total_rate, games)
+            width = max(int(counts.max()), 1)
+            slot = (rng.random((games, width), dtype=np.float32) * len(rates)).astype(np.int8)
+            np.minimum(slot, len(rates) - 1, out=slot)
+            category = np.where(rng.random((games, width), dtype=np.float32) < keep[slot],
+                                slot, alias[slot])
+            kind = kinds[category]
+            chance = makes[category]
+            first = rng.random((games, width), dtype=np.float32) < chance
+            #Trips to the line are two free throws
+            second = (kind == 2) & (rng.random((games, width), dtype=np.float32) < chance)
+            #Count possessions of every game by category and makes in one
+            #pass, padding goes to a last bin that is dropped
+            code = category.astype(np.int32)
+            code += (np.arange(games, dtype=np.int32) * len(rates))[:, None]
+            code *= 4
+            code += first * np.int32(2)
+            code += second
+            code[np.arange(width) >= counts[:, None]] = games * len(rates) * 4
+            tally = np.bincount(code.ravel(), minlength=games * len(rates) * 4 + 1)[:-1]
+            tally = tally.reshape(games, len(rates), 2, 2)
+            attempts = tally.sum(axis=(2, 3))
+            made = tally[:, :, 1, :].sum(axis=2)
+            made_second = tally[:, :, :, 1].sum(axis=2)
+            points = POINTS_PER_MAKE[kinds] * made + made_second
+            by_kind = np.eye(len(OUTCOMES), dtype=np.int64)[kinds]
+            attempts_by_kind = attempts @ by_kind
+            made_by_kind = made @ by_kind
+            results['points'][start:stop] = points.sum(axis=1)
+            results['possessions'][start:stop] = counts
+            results['FGA'][start:stop] = attempts_by_kind[:, 0] + attempts_by_kind[:, 1]
+            results['FGM'][start:stop] = made_by_kind[:, 0] + made_by_kind[:, 1]
+            results['3PA'][start:stop] = attempts_by_kind[:, 1]
+            results['3PM'][start:stop] = made_by_kind[:, 1]
+            results['FTA'][start:stop] = 2 * attempts_by_kind[:, 2]
+            results['FTM'][start:stop] = made_by_kind[:, 2] + made_second.sum(axis=1)
+            results['TOV'][start:stop] = attempts_by_kind[:, 3]
+            #Add each possession's points to the player who ended it
+            results['player_points'][start:stop] = points @ np.eye(len(rows), dtype=np.int64)[players]
+        return results
+
+
+def possession_model(season=None):
+    """Return the PossessionModel of the loaded dataset, rebuilt only when it changes
+
+    Parameters
+    ----------
+    season : int, tuple or range, Optional
+        Season or seasons to build the model from, default=None uses every
+        loaded season
+
+    Return
+    ------
+    model : PossessionModel
+        Cached model
+    """
+    aggregates = player_aggregates(season)
+    return _MODELS.get(season_bounds(season), aggregates.key,
+                       lambda: PossessionModel(aggregates))
+
+
+def simulate_possessions(team, n_games, rng=None, season=None):
+    """Simulate a Team's games possession by possession
+
+    Parameters
+    ----------
+    team : Team
+        Team to simulate, e.g. a SuperTeam or an opponent
+    n_games : int
+        Number of games to simulate
+    rng : numpy.random.Generator or int, Optional
+        Generator or seed for the draws, default=None uses fresh entropy
+    season : int, tuple or range, Optional
+        Season or seasons the players' rates come from, default=None uses
+        the seasons the Team was built from
+
+    Return
+    ------
+    results : dict
+        Dictionary of per game arrays, see PossessionModel.simulate
+    """
+    model = possession_model(team.season if season is None else season)
+    return model.simulate(model.aggregates.team_ids(team), n_games, rng)
@@ -0,0 +1,227 @@
+"""Functions for building a team out of hand-picked players.
+
+Players are found by name through a PlayerIndex built once per dataset.
+A name can be given as
+
+- the exact name, 'Nikola Jokić'
+- the name without accents or capitals, 'nikola jokic'
+- the start of the name or of any word in it, 'Jokic' or 'Nik'
+- a player id or 'Name\\playerid' as in the csv, 'jokicni01', which is the
+  way to pick one of several players with the same name
+
+The first of these that finds anyone is used, and a name that finds more
+than one player is an error listing them to choose from.
+"""
+
+import bisect
+import copy
+import difflib
+import unicodedata
+
+from .functions import STAT_NAMES, SeasonCache, SuperTeam, cached_team, player_aggregates, \
+    season_bounds
+from .metrics import timed
+
+#Players on a hand-picked team
+ROSTER_SIZE = 5
+#Names suggested when nothing is found
+MAX_SUGGESTIONS = 3
+
+_INDEXES = SeasonCache('player_index')
+
+
+def fold_name(name):
+    """Return a name without accents, capitals or punctuation for matching
+
+    Parameters
+    ----------
+    name : string
+        Player name, e.g. 'Nikola Jokić'
+
+    Return
+    ------
+    folded : string
+        Folded name, e.g. 'nikola jokic'
+    """
+    #Split accented letters into the letter and its accent, then drop accents
+    letters = [char for char in unicodedata.normalize('NFKD', name)
+               if not unicodedata.combining(char)]
+    #Keep letters, digits and spaces, so 'P.J.' and "D'Angelo" match 'pj' and 'dangelo'
+    kept = ''.join(char for char in ''.join(letters).casefold() if char.isalnum() or char.isspace())
+    return ' '.join(kept.split())
+
+
+class PlayerIndex():
+    """Class that finds players by exact, accent-insensitive or partial name
+
+    Parameters
+    ----------
+    aggregates : PlayerAggregates
+        Per-player averages whose players are indexed
+    """
+    def __init__(self, aggregates):
+        self.aggregates = aggregates
+        #Name and folded name to every player id with it, in 'Name\\id' order
+        self.exact = {}
+        self.folded = {}
+        #Sorted folded names, and every folded name starting from each later
+        #word, alongside their player ids for finding prefixes by bisection
+        words = []
+        for plyr in aggregates.means.index:
+            name = aggregates.names[plyr]
+            folded = fold_name(name)
+            self.exact.setdefault(name, []).append(plyr)
+            self.folded.setdefault(folded, []).append(plyr)
+            parts = folded.split(' ')
+            words.extend((' '.join(parts[start:]), plyr) for start in range(len(parts)))
+        words.sort()
+        self.words = [word for word, _ in words]
+        self.word_ids = [plyr for _, plyr in words]
+
+    def label(self, plyr):
+        """Return 'Name\\playerid' of a player id, which always finds only that player"""
+        return self.aggregates.label(plyr)
+
+    def find(self, query):
+        """Return every player a name finds
+
+        Parameters
+        ----------
+        query : string
+            Name, partial name, player id or 'Name\\playerid'
+
+        Return
+        ------
+        ids : list
+            List of player ids found, empty when nothing matches
+        """
+        query = query.strip()
+        #The player id after the backslash picks one player whatever the name
+        plyr = query.rpartition('\\')[2]
+        if plyr in self.aggregates.names:
+            return [plyr]
+        if query in self.exact:
+            return list(self.exact[query])
+        folded = fold_name(query)
+        if not folded:
+            return []
+        if folded in self.folded:
+            return list(self.folded[folded])
+        start = bisect.bisect_left(self.words, folded)
+        stop = bisect.bisect_left(self.words, folded + '\uffff', start)
+        #A player can match several of their words, keep each once
+        return list(dict.fromkeys(self.word_ids[start:stop]))
+
+    def resolve(self, query):
+        """Return the one player a name finds
+
+        Parameters
+        ----------
+        query : string
+            Name, partial name, player id or 'Name\\playerid'
+
+        Return
+        ------
+        plyr : string
+            Player id, e.g. 'jokicni01'
+        """
+        ids = self.find(query)
+        if not ids:
+            close = difflib.get_close_matches(fold_name(query), self.folded, MAX_SUGGESTIONS)
+            raise KeyError('no player found for ' + repr(query) + ', did you mean: ' +
+                           str([self.label(self.folded[name][0]) for name in close]))
+        if len(ids) > 1:
+            raise ValueError(repr(query) + ' matches more than one player, pick one of: ' +
+                             str([self.label(plyr) for plyr in ids]))
+        return ids[0]
+
+
+def player_index(season=None):
+    """Return the PlayerIndex of the loaded dataset, rebuilt only when it changes
+
+    Parameters
+    ----------
+    season : int, tuple or range, Optional
+        Season or seasons whose players are indexed, default=None uses every
+        loaded season
+
+    Return
+    ------
+    index : PlayerIndex
+        Cached index
+    """
+    aggregates = player_aggregates(season)
+    return _INDEXES.get(season_bounds(season), aggregates.key, lambda: PlayerIndex(aggregates))
+
+
+def pick_players(names, stat, season=None, ids=False):
+    """Return hand-picked players' name, average stat, and points per game for a given stat
+
+    Parameters
+    ----------
+    names : list
+        List of ROSTER_SIZE names, each found the way PlayerIndex.find does
+    stat : string
+        The type of stat going to be compared
+    season : int, tuple or range, Optional
+        Season or (first, last) seasons to pick players from, default=None
+        uses every loaded season
+    ids : bool, Optional
+        Whether to also return the players' ids last, default=False
+
+    Return
+    ------
+    players : dict
+        Dictionary with key of players and values of their average stats per
+        game, players who share a name are keyed by 'Name\\playerid'
+    points : list
+        List of players' average points per game
+    """
+    if len(names) != ROSTER_SIZE:
+        raise ValueError('pick exactly ' + str(ROSTER_SIZE) + ' players, got ' + str(len(names)))
+    index = player_index(season)
+    player_ids = [index.resolve(name) for name in names]
+    if len(set(player_ids)) != len(player_ids):
+        raise ValueError('a player was picked more than once: ' + str(names))
+    means = index.aggregates.means
+    players = {}
+    points = []
+    #Players who share a name are kept apart by their 'Name\\playerid' label
+    for plyr, name in zip(player_ids, index.aggregates.lineup_names(player_ids)):
+        players[name] = means.at[plyr, stat]
+        points.append(means.at[plyr, 'PTS'])
+    return (players, points, player_ids) if ids else (players, points)
+
+
+@timed('make_custom_team')
+def make_custom_team(names, stat, name='', season=None):
+    """Return a SuperTeam of hand-picked players, like make_superteam
+
+    Parameters
+    ----------
+    names : list
+        List of ROSTER_SIZE names, each found the way PlayerIndex.find does
+    stat : string
+        User friendly stat to filter with, a key of STAT_NAMES
+    name : string, Optional
+        Team name, default='' keeps the SuperTeam default name
+    season : int, tuple or range, Optional
+        Season or (first, last) seasons to pick players from, default=None
+        uses every loaded season
+
+    Return
+    ------
+    team : SuperTeam
+        SuperTeam of the picked players
+    """
+    ids = tuple(player_index(season).resolve(query) for query in names)
+
+    def build():
+        players, points, player_ids = pick_players(list(ids), STAT_NAMES[stat], season, ids=True)
+        return SuperTeam(players, points, player_ids=player_ids, season=season)
+    team = cached_team('custom', STAT_NAMES[stat], ids, season, build)
+    if name == '':
+        return team
+    named = copy.copy(team)
+    named.team = name
+    return named
@@ -0,0 +1,267 @@
+"""Functions for simulating whole seasons and playoffs with a Team in the league.
+
+The team joins the 30 NBA teams, each built from its top 5 players like
+create_opponent does. Before any season is played, every team's chance of
+beating every other team in one game is worked out once into a win
+probability matrix, and from it the chance of winning a best of 7 series.
+A simulated season is then only lookups and random draws: the games each
+pair of teams plays, the top 8 of each conference seeded by wins, and a
+1 v 8, 4 v 5, 2 v 7, 3 v 6 bracket through the conference finals to the
+finals. Thousands of seasons are drawn at once.
+
+Ties in a game go to overtime, which either team wins half the time.
+Home court, injuries and the play-in tournament are not modelled.
+"""
+
+from math import comb
+
+import numpy as np
+
+from .functions import GAME_MODELS, NBA_TEAMS, all_opponents
+from .distribution import score_distribution
+from .metrics import timed
+
+#Games every team plays in a season
+SEASON_GAMES = 82
+#Teams of each conference that make the playoffs, and wins to take a series
+PLAYOFF_SEEDS = 8
+SERIES_WINS = 4
+#Seeds in bracket order, so neighbours play each other every round
+BRACKET = (0, 7, 3, 4, 1, 6, 2, 5)
+#Eastern conference teams, every other NBA team is in the West
+EAST = ('ATL', 'BOS', 'BRK', 'CHI', 'CHO', 'CLE', 'DET', 'IND', 'MIA', 'MIL', 'NYK', 'ORL',
+        'PHI', 'TOR', 'WAS')
+#Games simulated per team for the possession model's points distribution
+MATRIX_GAMES = 20000
+#Seasons drawn at a time, each a row of every pair's games and every team's wins
+CHUNK_SEASONS = 5000
+#Columns of the table returned by simulate_seasons
+SEASON_COLUMNS = ['name', 'team', 'conference', 'mean_wins', 'playoff_prob',
+                  'second_round_prob', 'conference_finals_prob', 'finals_prob', 'title_prob']
+
+
+def _points_distributions(teams, model, n_games, rng):
+    """Return every team's chance of scoring each number of points, on one grid"""
+    if model == 'possession':
+        #Imported here since the exact distributions don't need it
+        from .possession import simulate_possessions
+
+        counts = [np.bincount(simulate_possessions(team, n_games, rng)['points'])
+                  for team in teams]
+        dists = [(np.arange(len(team_counts)), team_counts / n_games) for team_counts in counts]
+    else:
+        dists = [score_distribution(team, 'points') for team in teams]
+    grid = np.zeros((len(teams), max(int(totals[-1]) for totals, _ in dists) + 1))
+    for row, (totals, probs) in enumerate(dists):
+        grid[row, totals] = probs
+    return grid
+
+
+@timed('win_matrix')
+def win_matrix(teams, model='triangular', n_games=MATRIX_GAMES, rng=None):
+    """Return every team's chance of beating every other team in one game
+
+    Parameters
+    ----------
+    teams : list
+        List of Team classes
+    model : string, Optional
+        One of GAME_MODELS, default='triangular' uses the exact distribution
+        of each team's points, 'possession' simulates n_games per team
+    n_games : int, Optional
+        Games simulated per team for the possession model, default=MATRIX_GAMES
+    rng : numpy.random.Generator or int, Optional
+        Generator or seed for the possession model, default=None uses fresh
+        entropy
+
+    Return
+    ------
+    matrix : numpy.ndarray
+        Array of shape (teams, teams) where [i, j] is the chance team i beats
+        team j, counting half of the ties, so [i, j] + [j, i] is 1
+    """
+    if model not in GAME_MODELS:
+        raise ValueError('model must be one of ' + str(GAME_MODELS))
+    dists = _points_distributions(teams, model, n_games, np.random.default_rng(rng))
+    #Chance of scoring fewer than each number of points
+    below = np.cumsum(dists, axis=1) - dists
+    #Every pair at once: win when the other team scores fewer, ties count half
+    matrix = dists @ below.T + 0.5 * (dists @ dists.T)
+    np.fill_diagonal(matrix, 0.5)
+    return matrix
+
+
+def series_matrix(matrix, wins=SERIES_WINS):
+    """Return every team's chance of winning a best of (2 * wins - 1) series
+
+    Parameters
+    ----------
+    matrix : numpy.ndarray
+        Win probability matrix from win_matrix()
+    wins : int, Optional
+        Games needed to take the series, default=SERIES_WINS
+
+    Return
+    ------
+    series : numpy.ndarray
+        Array of the same shape with the chance team i takes a series from
+        team j
+    """
+    #Win the last game after winning wins - 1 of the games before it
+    return sum(comb(wins - 1 + losses, losses) * matrix ** wins * (1 - matrix) ** losses
+               for losses in range(wins))
+
+
+def season_schedule(n_teams, games=SEASON_GAMES):
+    """Return how many games each pair of teams plays in a season
+
+    Every pair plays the same number of games, then the games left over are
+    played against the teams closest in the league's order, so listing a
+    conference's teams together gives them more games with each other.
+
+    Parameters
+    ----------
+    n_teams : int
+        Number of teams in the league
+    games : int, Optional
+        Games every team plays, default=SEASON_GAMES
+
+    Return
+    ------
+    schedule : numpy.ndarray
+        Symmetric integer array of shape (n_teams, n_teams) with zeros on the
+        diagonal and every row summing to games
+    """
+    if n_teams < 2:
+        raise ValueError('a season needs at least 2 teams')
+    rounds, extra = divmod(games, n_teams - 1)
+    if extra % 2 and n_teams % 2:
+        raise ValueError(str(n_teams) + ' teams cannot each play ' + str(games) + ' games')
+    schedule = np.full((n_teams, n_teams), rounds)
+    np.fill_diagonal(schedule, 0)
+    #Distance of every pair going around the league's order
+    distance = np.abs(np.subtract.outer(np.arange(n_teams), np.arange(n_teams)))
+    distance = np.minimum(distance, n_teams - distance)
+    schedule[(distance > 0) & (distance <= extra // 2)] += 1
+    if extra % 2:
+        #Teams directly across the order make up the odd game
+        schedule[distance == n_teams // 2] += 1
+    return schedule
+
+
+def _play_bracket(bracket, series, rng):
+    """Play rounds of series until one team is left in each row
+
+    Parameters
+    ----------
+    bracket : numpy.ndarray
+        Team indexes of shape (seasons, teams) in bracket order
+    series : numpy.ndarray
+        Series win probability matrix
+    rng : numpy.random.Generator
+        Generator used for the draws
+
+    Return
+    ------
+    rounds : list
+        List of the winners of each round, the last one is the champion
+    """
+    rounds = []
+    while bracket.shape[1] > 1:
+        first, second = bracket[:, 0::2], bracket[:, 1::2]
+        won = rng.random(first.shape) < series[first, second]
+        bracket = np.where(won, first, second)
+        rounds.append(bracket)
+    return rounds
+
+
+@timed('simulate_seasons')
+def simulate_seasons(team, stat, n_seasons=10000, seed=None, season=None, conference='West',
+                     model='triangular'):
+    """Simulate seasons and playoffs of a Team and every NBA team built for a stat
+
+    Parameters
+    ----------
+    team : Team
+        Team to put in the league, usually a SuperTeam
+    stat : string
+        The type of stat the NBA teams are built from, e.g. 'PTS'
+    n_seasons : int, Optional
+        Number of seasons to simulate, default=10000
+    seed : int, Optional
+        Seed for the simulation, default=None uses fresh entropy
+    season : int, tuple or range, Optional
+        Season or (first, last) seasons to build the NBA teams from,
+        default=None uses every loaded season
+    conference : string, Optional
+        'East' or 'West', the conference team plays in, default='West'
+    model : string, Optional
+        One of GAME_MODELS the win probabilities come from,
+        default='triangular'
+
+    Return
+    ------
+    table : DataFrame
+        DataFrame with one row per team of its average wins and its chance
+        of making the playoffs, each later round, the finals and winning the
+        title, ranked from the likeliest champion to the least
+    """
+    import pandas as pd
+
+    if conference not in ('East', 'West'):
+        raise ValueError("conference must be 'East' or 'West', got " + repr(conference))
+    if n_seasons < 1:
+        raise ValueError('n_seasons must be at least 1')
+    rng = np.random.default_rng(seed)
+    opponents = all_opponents(stat, season)
+    names = {code: name for name, code in NBA_TEAMS.items()}
+    #List each conference's teams together so they play each other more
+    east = [opponent for opponent in opponents.values() if opponent.team in EAST]
+    west = [opponent for opponent in opponents.values() if opponent.team not in EAST]
+    (east if conference == 'East' else west).append(team)
+    league = east + west
+    conferences = [np.arange(len(east)), np.arange(len(east), len(league))]
+    if min(len(east), len(west)) < PLAYOFF_SEEDS:
+        raise ValueError('each conference needs ' + str(PLAYOFF_SEEDS) + ' teams for the playoffs')
+
+    matrix = win_matrix(league, model, rng=rng)
+    series = series_matrix(matrix)
+    schedule = season_schedule(len(league))
+    home, away = np.nonzero(np.triu(schedule))
+    games, chances = schedule[home, away], matrix[home, away]
+    #Which team each pair's first and second team is, to add up wins
+    first_team = np.eye(len(league))[home]
+    second_team = np.eye(len(league))[away]
+
+    wins = np.zeros(len(league))
+    #Seasons each team reached the playoffs, each later round and the title
+    reached = np.zeros((5, len(league)), dtype=np.int64)
+    for start in range(0, n_seasons, CHUNK_SEASONS):
+        seasons = min(CHUNK_SEASONS, n_seasons - start)
+        pair_wins = rng.binomial(games, chances, (seasons, len(games)))
+        team_wins = pair_wins @ first_team + (games - pair_wins) @ second_team
+        wins += team_wins.sum(axis=0)
+        #Top seeds by wins, with a random draw breaking ties
+        ranking = team_wins + rng.random(team_wins.shape)
+        champions = []
+        for members in conferences:
+            order = np.argsort(-ranking[:, members], axis=1, kind='stable')[:, :PLAYOFF_SEEDS]
+            seeds = members[order]
+            reached[0] += np.bincount(seeds.ravel(), minlength=len(league))
+            rounds = _play_bracket(seeds[:, list(BRACKET)], series, rng)
+            for stage, winners in enumerate(rounds, 1):
+                reached[stage] += np.bincount(winners.ravel(), minlength=len(league))
+            champions.append(rounds[-1])
+        title = _play_bracket(np.hstack(champions), series, rng)[-1]
+        reached[4] += np.bincount(title.ravel(), minlength=len(league))
+
+    rows = [{'name': names.get(member.team, member.team), 'team': member.team,
+             'conference': 'East' if index < len(east) else 'West',
+             'mean_wins': wins[index] / n_seasons}
+            for index, member in enumerate(league)]
+    for column, counts in zip(SEASON_COLUMNS[4:], reached):
+        for row, count in zip(rows, counts.tolist()):
+            row[column] = count / n_seasons
+    table = pd.DataFrame(rows, columns=SEASON_COLUMNS)
+    table = table.sort_values(['title_prob', 'mean_wins'], ascending=False, kind='mergesort')
+    return table.reset_index(drop=True)
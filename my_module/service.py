@@ -0,0 +1,354 @@
+"""Functions for serving the Superteam builder as a local HTTP/JSON service.
+
+Every client makes a session and builds its team and opponent in it, so
+concurrent clients never share the TEAM, OPPONENT and CHOSEN_STAT globals
+the GUI uses. Endpoints, all taking and returning JSON:
+
+POST   /sessions                     make a session, returns its id
+DELETE /sessions/<id>                drop a session
+POST   /sessions/<id>/team           like create_team: bal, stat, name, season, or
+                                     players to hand-pick five players by name
+POST   /sessions/<id>/opponent       like create_opponent: team, season
+POST   /sessions/<id>/game           like play_game, returns the scores and lines
+POST   /sessions/<id>/simulate       n_games against the opponent or a list of
+                                     opponents
+GET    /metrics                      get_metrics() of the service process
+
+Games and simulations take an optional seed. Without one they draw from
+the session's own random stream, spawned from the service's seed, so no
+two sessions or threads share a stream.
+"""
+
+import argparse
+import asyncio
+import json
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .functions import STAT_NAMES, TEAM_TYPES, game_result, make_opponent, make_superteam, \
+    opponent_message, team_message
+from .league import play_matchup
+from .metrics import count, get_metrics, timer
+from .roster import make_custom_team
+
+HOST = '127.0.0.1'
+PORT = 8080
+#Sessions kept before the least recently used one is dropped
+MAX_SESSIONS = 10000
+#Largest request body and number of games a simulate call accepts
+MAX_BODY = 1 << 20
+MAX_GAMES = 1000000
+
+REASONS = {200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 409: 'Conflict', 413: 'Payload Too Large',
+           500: 'Internal Server Error'}
+
+
+class ServiceError(Exception):
+    """Error sent back to the client with an HTTP status"""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Session():
+    """Class that stores one client's team, opponent, chosen stat and random stream
+
+    Parameters
+    ----------
+    rng : numpy.random.Generator
+        Generator the session's games are drawn from
+    """
+    def __init__(self, rng):
+        self.rng = rng
+        self.team = None
+        self.opponent = None
+        self.chosen_stat = None
+
+
+def _season(value):
+    """Return a season parameter from JSON, where (first, last) comes as a list"""
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _simulate_batch(team, opponents, n_games, seed):
+    """Simulate a Team against several opponents and return their summaries
+
+    Parameters
+    ----------
+    team : Team
+        Team to simulate, usually a SuperTeam
+    opponents : dict
+        Dictionary of opponent names to Team classes
+    n_games : int
+        Number of games simulated against each opponent
+    seed : int or None
+        Seed each matchup's random stream is spawned from
+
+    Return
+    ------
+    rows : list
+        List of one summary dictionary per opponent
+    """
+    seeds = np.random.SeedSequence(seed).spawn(len(opponents))
+    return [play_matchup(name, team, opponent, n_games, matchup_seed)
+            for (name, opponent), matchup_seed in zip(opponents.items(), seeds)]
+
+
+class SuperteamService():
+    """Class that routes JSON requests to per-session Superteam functions
+
+    Parameters
+    ----------
+    executor : concurrent.futures.Executor, Optional
+        Executor simulations run on so the event loop stays responsive,
+        default=None uses a process pool with one worker per core
+    max_sessions : int, Optional
+        Sessions kept before the least recently used is dropped,
+        default=MAX_SESSIONS
+    seed : int, Optional
+        Seed every session's random stream is spawned from, default=None
+        uses fresh entropy
+    """
+    def __init__(self, executor=None, max_sessions=MAX_SESSIONS, seed=None):
+        self.executor = ProcessPoolExecutor() if executor is None else executor
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()
+        self.seeds = np.random.SeedSequence(seed)
+
+    def _session(self, session_id):
+        """Return a session by id, marking it as recently used"""
+        if session_id not in self.sessions:
+            raise ServiceError(404, 'unknown session: ' + session_id)
+        self.sessions.move_to_end(session_id)
+        return self.sessions[session_id]
+
+    async def handle(self, method, path, body):
+        """Return the status and JSON payload for one request
+
+        Parameters
+        ----------
+        method : string
+            HTTP method, e.g. 'POST'
+        path : string
+            Request path, e.g. '/sessions/<id>/team'
+        body : dict
+            Decoded JSON body, empty when there was none
+
+        Return
+        ------
+        status : int
+            HTTP status
+        payload : dict
+            Payload to send back as JSON
+        """
+        parts = path.split('?')[0].strip('/').split('/')
+        #Time each endpoint, not each session id
+        name = 'service_' + (parts[2] if len(parts) == 3 else parts[0] or 'root')
+        with timer(name):
+            try:
+                status, payload = await self._route(method, parts, body)
+            except ServiceError as error:
+                status, payload = error.status, {'error': str(error)}
+            except (KeyError, ValueError, TypeError) as error:
+                status, payload = 400, {'error': type(error).__name__ + ': ' + str(error)}
+            except Exception as error:
+                #Anything else is a bug, answer it instead of dropping the connection
+                status, payload = 500, {'error': 'internal error: ' + type(error).__name__}
+        count('service_status_' + str(status))
+        return status, payload
+
+    async def _route(self, method, parts, body):
+        """Run the endpoint a split up path points to"""
+        if parts == ['metrics'] and method == 'GET':
+            return 200, get_metrics()
+        if parts[0] != 'sessions' or len(parts) > 3:
+            raise ServiceError(404, 'unknown path: /' + '/'.join(parts))
+        if len(parts) == 1:
+            if method != 'POST':
+                raise ServiceError(405, 'sessions only accepts POST')
+            session_id = uuid.uuid4().hex
+            self.sessions[session_id] = Session(np.random.default_rng(self.seeds.spawn(1)[0]))
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+            return 201, {'session': session_id}
+        session = self._session(parts[1])
+        if len(parts) == 2:
+            if method != 'DELETE':
+                raise ServiceError(405, 'a session only accepts DELETE')
+            del self.sessions[parts[1]]
+            return 200, {'session': parts[1]}
+        if method != 'POST':
+            raise ServiceError(405, parts[2] + ' only accepts POST')
+        endpoint = {'team': self._team, 'opponent': self._opponent,
+                    'game': self._game, 'simulate': self._simulate}.get(parts[2])
+        if endpoint is None:
+            raise ServiceError(404, 'unknown endpoint: ' + parts[2])
+        return 200, await endpoint(session, body)
+
+    async def _team(self, session, body):
+        """Build a session's SuperTeam like create_team, or of hand-picked players"""
+        stat = body['stat']
+        if stat not in STAT_NAMES:
+            raise ServiceError(400, 'stat must be one of ' + str(list(STAT_NAMES)))
+        if 'players' in body:
+            if not isinstance(body['players'], list) or \
+                    not all(isinstance(player, str) for player in body['players']):
+                raise ServiceError(400, 'players must be a list of names')
+            build, choice = make_custom_team, body['players']
+        else:
+            build, choice = make_superteam, body.get('bal', 'Unbalanced')
+            if choice not in TEAM_TYPES:
+                raise ServiceError(400, 'bal must be one of ' + str(list(TEAM_TYPES)))
+        #The first team of a dataset builds its averages, so keep it off the loop
+        team = await asyncio.get_running_loop().run_in_executor(
+            None, build, choice, stat, body.get('name', ''), _season(body.get('season')))
+        session.team, session.chosen_stat = team, stat
+        #A new stat means the old opponent was built for a different one
+        session.opponent = None
+        return {'message': team_message(team, stat), 'team': team.team, 'players': team.players,
+                'points': [float(ppg) for ppg in team.point]}
+
+    async def _opponent(self, session, body):
+        """Build a session's opponent like create_opponent"""
+        if session.chosen_stat is None:
+            raise ServiceError(409, 'make a team before choosing an opponent')
+        name = body['team']
+        opponent = await asyncio.get_running_loop().run_in_executor(
+            None, make_opponent, name, session.chosen_stat, _season(body.get('season')))
+        if not opponent.players:
+            raise ServiceError(400, 'no players found for team: ' + name)
+        session.opponent = opponent
+        return {'message': opponent_message(opponent, name, session.chosen_stat),
+                'team': opponent.team, 'players': opponent.players,
+                'points': [float(ppg) for ppg in opponent.point]}
+
+    def _ready(self, session):
+        """Raise unless the session has both a team and an opponent"""
+        if session.team is None or session.opponent is None:
+            raise ServiceError(409, 'make a team and an opponent first')
+
+    async def _game(self, session, body):
+        """Play one game like play_game, a handful of draws so it runs inline"""
+        self._ready(session)
+        return game_result(session.team, session.opponent, session.chosen_stat,
+                           body.get('seed', session.rng))
+
+    async def _simulate(self, session, body):
+        """Simulate many games against the session's opponent or a list of teams"""
+        if session.team is None:
+            raise ServiceError(409, 'make a team first')
+        n_games = body.get('n_games', 10000)
+        #JSON numbers can be floats up to infinity, and True would count as 1
+        if not isinstance(n_games, int) or isinstance(n_games, bool) or \
+                not 0 < n_games <= MAX_GAMES:
+            raise ServiceError(400, 'n_games must be a whole number between 1 and ' +
+                               str(MAX_GAMES))
+        loop = asyncio.get_running_loop()
+        if 'opponents' in body:
+            season = _season(body.get('season'))
+            opponents = {}
+            for name in body['opponents']:
+                opponents[name] = await loop.run_in_executor(
+                    None, make_opponent, name, session.chosen_stat, season)
+        else:
+            self._ready(session)
+            opponents = {session.opponent.team: session.opponent}
+        seed = body['seed'] if 'seed' in body else int(session.rng.integers(1 << 63))
+        rows = await loop.run_in_executor(self.executor, _simulate_batch, session.team,
+                                          opponents, n_games, seed)
+        return {'n_games': n_games, 'results': rows}
+
+    async def client_connected(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection until the client closes it"""
+        try:
+            while True:
+                request = await reader.readline()
+                if not request:
+                    break
+                method, target, version = request.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY:
+                    status, payload = 413, {'error': 'request body is too large'}
+                else:
+                    raw = await reader.readexactly(length) if length else b''
+                    try:
+                        body = json.loads(raw) if raw else {}
+                    except ValueError:
+                        status, payload = 400, {'error': 'request body is not JSON'}
+                    else:
+                        if isinstance(body, dict):
+                            status, payload = await self.handle(method, target, body)
+                        else:
+                            status, payload = 400, {'error': 'request body must be an object'}
+                close = headers.get('connection', '').lower() == 'close' or \
+                    version == 'HTTP/1.0' or status == 413
+                data = json.dumps(payload).encode()
+                writer.write((version + ' ' + str(status) + ' ' + REASONS[status] + '\r\n' +
+                              'Content-Type: application/json\r\n' +
+                              'Content-Length: ' + str(len(data)) + '\r\n' +
+                              ('Connection: close\r\n' if close else '') + '\r\n').encode() + data)
+                await writer.drain()
+                if close:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host=HOST, port=PORT, executor=None, ready=None, seed=None):
+    """Run the service until it is cancelled
+
+    Parameters
+    ----------
+    host : string, Optional
+        Address to listen on, default=HOST
+    port : int, Optional
+        Port to listen on, default=PORT and 0 picks a free port
+    executor : concurrent.futures.Executor, Optional
+        Executor simulations run on, default=None uses a process pool
+    ready : asyncio.Future, Optional
+        Future set to the (host, port) listened on once the server is up,
+        default=None
+    seed : int, Optional
+        Seed the sessions' random streams are spawned from, default=None
+        uses fresh entropy
+    """
+    service = SuperteamService(executor, seed=seed)
+    server = await asyncio.start_server(service.client_connected, host, port)
+    if ready is not None:
+        ready.set_result(server.sockets[0].getsockname()[:2])
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    """Run the service from the command line"""
+    parser = argparse.ArgumentParser(description='Serve the Superteam builder as JSON over HTTP.')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='simulation worker processes, default uses every core')
+    parser.add_argument('--seed', type=int, default=None,
+                        help="seed the sessions' random streams are spawned from")
+    args = parser.parse_args(argv)
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        try:
+            asyncio.run(serve(args.host, args.port, executor, seed=args.seed))
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Test for my accumulator functions."""
+
+import numpy as np
+import pytest
+
+from my_module.functions import SuperTeam, Team, top_5
+from my_module.accumulator import Histogram, RunningStats, SimulationAccumulator, simulate_stream
+
+
+def test_simulation_accumulator():
+    """Function does testing on SimulationAccumulator, RunningStats and Histogram classes"""
+    team = SuperTeam(*top_5('PTS'))
+    opponent = Team(*top_5('PTS', 'LAL'))
+    results = team.simulate(30000, opponent, rng=5)
+    whole = SimulationAccumulator()
+    whole.update(results['points'], results['opponent_points'])
+    summary = whole.summary()
+    #Same summaries as keeping every score
+    for key in ('win_prob', 'tie_prob', 'loss_prob', 'mean_points', 'mean_margin'):
+        assert summary[key] == pytest.approx(results[key])
+    assert summary['std_margin'] == pytest.approx(results['margin'].std(ddof=1))
+    assert summary['margin_percentiles'] == pytest.approx(results['margin_percentiles'])
+    assert summary['points_percentiles'] == pytest.approx(results['points_percentiles'])
+    #Merging parts or adding games one at a time gives the same summary
+    parts = [SimulationAccumulator() for _ in range(3)]
+    for part, points, oppo_pts in zip(parts, np.array_split(results['points'], 3),
+                                      np.array_split(results['opponent_points'], 3)):
+        part.update(points, oppo_pts)
+    merged = parts[0].merge(parts[1]).merge(parts[2]).summary()
+    single = SimulationAccumulator()
+    for points, oppo_pts in zip(results['points'][:500], results['opponent_points'][:500]):
+        single.add_game(points, oppo_pts)
+    half = SimulationAccumulator()
+    half.update(results['points'][:500], results['opponent_points'][:500])
+    for key, value in summary.items():
+        assert merged[key] == pytest.approx(value)
+    for key, value in half.summary().items():
+        assert single.summary()[key] == pytest.approx(value)
+    #Scores outside the range only land in the edge bins
+    stats, histogram = RunningStats(), Histogram(0, 10)
+    stats.update([-5, 3, 20])
+    histogram.update(np.array([-5, 3, 20]))
+    assert stats.min == -5 and stats.max == 20 and histogram.counts[[0, 3, 9]].tolist() == [1, 1, 1]
+    with pytest.raises(ValueError):
+        histogram.merge(Histogram(0, 5))
+
+    streamed = simulate_stream(team, 25000, opponent, rng=9, chunk_games=4000).summary()
+    assert streamed['n_games'] == 25000 and abs(streamed['win_prob'] - summary['win_prob']) < 0.02
+    assert 'win_prob' not in simulate_stream(team, 10, rng=1).summary()
@@ -0,0 +1,35 @@
+"""Test for my batch functions."""
+
+import io
+import json
+
+from my_module.batch import run_batch
+
+SCENARIOS = '''{"bal": "Balanced", "stat": "Rebounds", "name": "Bigs", "opponent": "Miami Heat"}
+{"stat": "Points", "opponent": "LAL", "n_games": 500}
+
+{"stat": "Dunks", "opponent": "LAL"}
+[1]
+null
+{"bal": "an", "stat": "Points", "opponent": "LAL"}
+{"stat": "Points", "opponent": "LAL", "n_games": 1e999}
+'''
+
+
+def test_run_batch():
+    """Function does testing on run_batch function"""
+    output = io.StringIO()
+    assert run_batch(io.StringIO(SCENARIOS), output, workers=1, seed=11, n_games=1000) == 7
+    rows = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [row['line'] for row in rows] == [1, 2, 4, 5, 6, 7, 8]
+    assert rows[0]['name'] == 'Bigs' and rows[0]['team'] == 'MIA'
+    assert rows[1]['players'][0] == 'James Harden' and rows[1]['win_prob'] > 0.9
+    assert 'Dunks' in rows[2]['error']
+    #JSON that isn't an object is an error line, not a failed batch
+    assert 'object' in rows[3]['error'] and 'object' in rows[4]['error']
+    #Team types are matched exactly and n_games must be a whole number
+    assert 'bal' in rows[5]['error'] and 'n_games' in rows[6]['error']
+    #Same seed gives the same results with a process pool, in any order
+    pooled = io.StringIO()
+    run_batch(io.StringIO(SCENARIOS), pooled, workers=2, seed=11, n_games=1000)
+    assert sorted(pooled.getvalue().splitlines()) == sorted(output.getvalue().splitlines())
@@ -0,0 +1,27 @@
+"""Test for my benchmark functions."""
+
+from my_module.benchmark import Case, compare, run_benchmarks, time_case
+
+
+def test_benchmarks():
+    """Function does testing on run_benchmarks and compare functions"""
+    results = run_benchmarks(['top_5_team', 'top_5_team_cold', 'simulate_1'], min_time=0.01)
+    assert sorted(results['benchmarks']) == ['simulate_1', 'top_5_team', 'top_5_team_cold']
+    timing = results['benchmarks']['top_5_team']
+    assert timing['rounds'] >= 3 and 0 < timing['min'] <= timing['median']
+    #Cold rounds build the aggregates the warm ones find cached
+    assert results['benchmarks']['top_5_team_cold']['min'] > timing['median']
+    #Only medians slower than the threshold are flagged
+    slower = {'benchmarks': {'top_5_team': dict(timing, median=timing['median'] * 2)}}
+    assert compare(slower, results) == {'top_5_team': 2.0}
+    assert compare(results, slower) == {}
+    assert compare(slower, results, threshold=1.5) == {}
+
+
+def test_time_case():
+    """Function does testing on setups and self timed cases in time_case"""
+    setups = []
+    timing = time_case(Case(lambda: None, lambda: setups.append(1)), min_time=0)
+    #Setup runs before the warm up and every round
+    assert len(setups) == timing['rounds'] + 1
+    assert time_case(Case(lambda: 0.5, self_timed=True), min_time=0)['median'] == 0.5
@@ -0,0 +1,31 @@
+"""Test for my box score functions."""
+
+import numpy as np
+
+from my_module.functions import STATS, SuperTeam, top_5_balanced
+from my_module.boxscore import box_score_model, box_totals, simulate_box_scores
+
+
+def test_simulate_box_scores():
+    """Function does testing on simulate_box_scores and box_totals functions"""
+    team = SuperTeam(*top_5_balanced('AST'))
+    box = simulate_box_scores(team, 200000, rng=4)
+    assert box.shape == (200000, 5) and box.dtype.names == STATS
+    #Every stat keeps the triangular model of points() and stat()
+    model = box_score_model()
+    means = model.means[[model.index[plyr] for plyr in model.player_ids(team)]]
+    lower = np.maximum(means - model.spreads, 0)
+    upper = means + model.spreads
+    for col, stat in enumerate(STATS):
+        assert (box[stat] >= lower[:, col] - 1e-4).all() and (box[stat] <= upper[:, col] + 1e-4).all()
+        assert np.allclose(box[stat].mean(axis=0), (lower[:, col] + means[:, col] + upper[:, col]) / 3,
+                           atol=0.05)
+    #Stats of a player move together the way the covariance says
+    player = model.player_ids(team)[0]
+    simulated = np.cov(np.vstack([box[stat][:, 0] for stat in STATS]))
+    assert np.allclose(simulated, model.covariance(player), atol=0.3)
+    assert np.corrcoef(box['PTS'][:, 0], box['AST'][:, 0])[0, 1] > 0.3
+    totals = box_totals(box)
+    assert totals['PTS'].dtype == np.int64 and abs(totals['PTS'].mean() - team.simulate(
+        200000, rng=4)['points'].mean()) < 0.3
+    assert (simulate_box_scores(team, 10, rng=1) == simulate_box_scores(team, 10, rng=1)).all()
@@ -0,0 +1,34 @@
+"""Test for my distribution functions."""
+
+import numpy as np
+
+from my_module.functions import Team, SuperTeam, top_5
+from my_module.distribution import score_distribution, matchup_distribution
+
+
+def test_score_distribution():
+    """Function does testing on score_distribution function"""
+    team = Team({'A': 0.0, 'B': 1.0, 'C': 2.0, 'D': 3.0, 'E': 10.0},
+                [0.0, 5.0, 10.0, 20.0, 30.0], 'TST')
+    totals, probs = score_distribution(team)
+    assert abs(probs.sum() - 1) < 1e-12 and (probs >= 0).all()
+    #Lowest and highest totals match the clamped bounds of points()
+    assert totals[probs > 1e-15][0] >= 20 and totals[-1] <= 140
+    totals, probs = score_distribution(team, 'stat')
+    assert totals[0] >= 7 and totals[-1] <= 31
+
+
+def test_matchup_distribution():
+    """Function does testing on matchup_distribution against Team.simulate"""
+    team = SuperTeam(*top_5('AST'))
+    opponent = Team(*top_5('PTS', 'LAL'))
+    exact = matchup_distribution(team, opponent)
+    assert abs(exact['win_prob'] + exact['tie_prob'] + exact['loss_prob'] - 1) < 1e-12
+    sampled = team.simulate(400000, opponent, rng=10)
+    #Monte Carlo agrees with the exact answer within sampling noise
+    assert abs(exact['win_prob'] - sampled['win_prob']) < 0.005
+    assert abs(exact['tie_prob'] - sampled['tie_prob']) < 0.002
+    assert abs(exact['mean_margin'] - sampled['mean_margin']) < 0.1
+    margins, counts = np.unique(sampled['margin'], return_counts=True)
+    probs = dict(zip(exact['margins'], exact['margin_probs']))
+    assert max(abs(count / 400000 - probs[margin]) for margin, count in zip(margins, counts)) < 0.002
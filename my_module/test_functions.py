@@ -7,8 +7,19 @@ Note: because these are 'empty' functions (return None), here we just test
 
 ##
 ##
-from functions import top_5, top_5_balanced, create_team, create_opponent, play_game, final_path
-from classes import Team, SuperTeam
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+import shutil
+import subprocess
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+from my_module import functions
+from my_module.functions import top_5, top_5_balanced, create_team, create_opponent, play_game, final_path
+from my_module.functions import Team, SuperTeam, PlayerAggregates, player_aggregates, top_5_all_teams, all_opponents
+from my_module.functions import _assign_positions, game_result, top_5_weighted
 
 def test_top_5():
     """Function does testing on top_5 function"""
@@ -18,6 +29,37 @@ def test_top_5():
                                     10.766666666666666, 9.3], 'LAL')
     assert callable(top_5)
 
+def test_top_5_all_teams():
+    """Function does testing on top_5_all_teams and all_opponents functions"""
+    teams = top_5_all_teams('PTS')
+    assert len(teams) == 30
+    assert teams['Los Angeles Lakers'] == top_5('PTS', 'LAL')
+    #Players with an empty column (no 3 point attempts) are still on their team
+    assert 'Clint Capela' in teams['Houston Rockets'][0]
+    opponents = all_opponents('AST')
+    assert opponents['Utah Jazz'].team == 'UTA'
+    assert len(opponents['Utah Jazz'].point) == 5
+
+def test_top_5_weighted():
+    """Function does testing on top_5_weighted function"""
+    assert top_5_weighted({'PTS': 1}) == top_5('PTS')
+    assert top_5_weighted({'TRB': 1}, 'LAL') == top_5('TRB', 'LAL')
+    fantasy = {'PTS': 1, 'TRB': 1.2, 'AST': 1.5, 'STL': 3, 'BLK': 3, 'TOV': -1}
+    weightings = [fantasy, {'AST': 2, 'TOV': -1}, {'STL': 1}]
+    teams = top_5_weighted(weightings)
+    single = top_5_weighted(fantasy)
+    assert list(teams[0][0]) == list(single[0]) and len(teams) == 3
+    assert list(teams[0][0].values()) == pytest.approx(list(single[0].values()))
+    #Same top 5 as scoring and sorting every player, ties in 'Name\\id' order
+    means = player_aggregates().means
+    for weights, (players, points) in zip(weightings, teams):
+        scores = sum(means[col] * weight for col, weight in weights.items())
+        best = scores.sort_values(ascending=False, kind='mergesort').index[:5]
+        assert list(players) == [player_aggregates().names[plyr] for plyr in best]
+        assert np.allclose(list(players.values()), scores[best])
+        assert points == means.loc[best, 'PTS'].tolist()
+    assert top_5_weighted([]) == []
+
 def test_top_5_balanced():
     """Function does testing on top_5_balanced function"""
     assert top_5_balanced('AST') == ({'LeBron James': [10.2, 'PG'], 'James Harden':\
@@ -26,6 +68,80 @@ def test_top_5_balanced():
                                     [6.0, 'SF']}, [25.3, 34.3, 19.9, 8.0, 19.9])
     assert callable(top_5_balanced)
 
+def test_top_5_balanced_other_positions():
+    """Function does testing on top_5_balanced when players have other positions"""
+    original = functions.df
+    functions.df = original.copy()
+    pos = functions.df['Pos'].cat.add_categories(['G'])
+    pos[functions.df['Player'] == 'James Harden'] = 'G'
+    functions.df['Pos'] = pos
+    try:
+        players = top_5_balanced('PTS')[0]
+        #A 'G' primary doesn't add a sixth player or fill a position
+        assert len(players) == 5 and 'James Harden' not in players
+        assert sorted(pos for _, pos in players.values()) == sorted(functions.POSITIONS)
+    finally:
+        functions.df = original
+
+def test_top_5_same_name():
+    """Function does testing on top 5 lineups of players who share a name"""
+    original = functions.df
+    functions.df = original.copy()
+    for name in ('Bradley Beal', 'Karl-Anthony Towns'):
+        functions.df.loc[functions.df['Player'] == name, 'Player'] = 'James Harden'
+    try:
+        players, points, player_ids = top_5('PTS', ids=True)
+        #Both James Hardens are kept, each with their own stat and points
+        assert list(players)[:2] == ['James Harden\\hardeja01', 'James Harden\\bealbr01']
+        assert list(players.values()) == points and len(player_ids) == 5
+        assert top_5_weighted({'PTS': 1})[0] == players
+        balanced = top_5_balanced('PTS')[0]
+        assert balanced['James Harden\\townska01'] == [26.5, 'C'] and len(balanced) == 5
+        team = SuperTeam(players, points, player_ids=player_ids)
+        assert len(team.names) == len(team.point_values) == 5
+        assert functions.player_aggregates().team_ids(team) == player_ids
+        assert functions.player_aggregates().ids_for(list(players)) == player_ids
+        #A roster whose names and points don't line up is refused
+        with pytest.raises(ValueError):
+            SuperTeam({'James Harden': 30.5}, points)
+    finally:
+        functions.df = original
+
+def test_position_ranked():
+    """Function does testing on the position index of PlayerAggregates"""
+    frame = pd.DataFrame({'Player': ['Kevin Knox', 'Kevin Knox Jr', 'Al Smith'],
+                                    'player_id': ['knoxke01', 'knoxke02', 'smithal01'],
+                                    'Pos': ['SF-PF', 'C', 'PG'],
+                                    'Tm': ['NYK', 'NYK', 'NYK'],
+                                    'PTS': [10.0, 20.0, 5.0], 'AST': [1.0, 2.0, 3.0],
+                                    'TRB': [1.0, 2.0, 3.0], 'STL': [1.0, 2.0, 3.0],
+                                    'BLK': [1.0, 2.0, 3.0]})
+    aggregates = PlayerAggregates(frame, None)
+    #Names that contain another player's name keep their own position
+    assert aggregates.positions['knoxke01'] == 'SF'
+    assert aggregates.positions['knoxke02'] == 'C'
+    rankings = aggregates.position_ranked('PTS')
+    assert sorted(rankings) == ['C', 'PG', 'SF']
+    assert rankings['C'] == [0] and rankings['SF'] == [1] and rankings['PG'] == [2]
+    #Multi-position players are eligible at every position they are listed at
+    assert aggregates.eligible['knoxke01'] == {'SF', 'PF'}
+    eligible = aggregates.eligible_ranked('PTS')
+    assert eligible['SF'] == [1] and eligible['PF'] == [1] and eligible['C'] == [0]
+
+def test_assign_positions():
+    """Function does testing on the position assignment of balanced teams"""
+    #The SF-PF scorer moves to PF so the second best SF makes the team too
+    values = [30.0, 25.0, 10.0, 5.0, 4.0, 3.0]
+    eligible = [{'SF', 'PF'}, {'SF'}, {'PF'}, {'C'}, {'PG'}, {'SG'}]
+    assert _assign_positions(values, eligible) == [(0, 'PF'), (1, 'SF'), (3, 'C'), (4, 'PG'),
+                                                   (5, 'SG')]
+    #Equal totals keep the better ranked players
+    assert _assign_positions([5.0, 5.0, 5.0], [{'C'}, {'C'}, {'PG'}]) == [(0, 'C'), (2, 'PG')]
+    players, points = top_5_balanced('AST', flexible=True)
+    assert sorted(pos for _, pos in players.values()) == ['C', 'PF', 'PG', 'SF', 'SG']
+    assert sum(spg for spg, _ in players.values()) >= \
+        sum(spg for spg, _ in top_5_balanced('AST')[0].values())
+
 def test_create_team():
     """Function does testing on create_team function"""
     assert isinstance(create_team('Balanced', 'Points', ''), str)
@@ -49,3 +165,197 @@ def test_final_path():
     assert isinstance(final_path('Exit'), str)
     assert final_path('Exit') == '\nOkay, thanks for making your team! Bye!'
     assert callable(final_path)
+
+def test_simulate():
+    """Function does testing on Team.simulate method"""
+    team = SuperTeam({'A': 10.0, 'B': 1.0, 'C': 0.0, 'D': 5.0, 'E': 2.5},
+                     [30.0, 20.0, 10.0, 5.0, 0.0])
+    opponent = Team({'F': 3.0, 'G': 3.0, 'H': 3.0, 'I': 3.0, 'J': 3.0},
+                    [10.0, 10.0, 10.0, 10.0, 10.0], 'OPP')
+    results = team.simulate(10000, opponent, rng=18)
+    #Bounds match points() and stat(): +/- 15 and +/- 3 clamped at zero
+    assert results['points'].min() >= 20 and results['points'].max() <= 140
+    assert results['stats'].min() >= 9 and results['stats'].max() <= 33
+    assert results['win_prob'] + results['tie_prob'] + results['loss_prob'] == 1
+    assert abs(results['mean_margin'] - 50 / 3) < 1
+    assert results['margin_percentiles'][5] <= results['margin_percentiles'][95]
+    #Same seed gives the same games
+    assert (team.simulate(100, rng=3)['points'] == team.simulate(100, rng=3)['points']).all()
+
+def test_team_roster():
+    """Function does testing on the array roster of Team"""
+    team = SuperTeam({'A': [10.0, 'PG'], 'B': [1.0, 'C'], 'C': [2.0, 'G']}, [30.0, 20.0, 5.0])
+    assert team.names == ('A', 'B', 'C')
+    assert team.stat_values.dtype == np.float64 and list(team.stat_means()) == [10.0, 1.0, 2.0]
+    assert list(team.position_codes) == [2, 0, -1] and team.positions[2] == 'G'
+    assert team.players == {'A': [10.0, 'PG'], 'B': [1.0, 'C'], 'C': [2.0, 'G']}
+    assert list(team.point) == [30.0, 20.0, 5.0]
+    copy = pickle.loads(pickle.dumps(team))
+    assert isinstance(copy, SuperTeam) and copy.players == team.players and copy.team == 'Superteam'
+    plain = Team({'D': 3.0}, [12.0], 'OPP')
+    assert plain.positions is None and plain.players == {'D': 3.0}
+    with pytest.raises(AttributeError):
+        plain.extra = 1
+
+def test_seeded_games():
+    """Function does testing on seeded points, stat and game_result"""
+    team = SuperTeam({'A': 10.0, 'B': 1.0}, [30.0, 20.0])
+    opponent = Team({'F': 3.0, 'G': 3.0}, [10.0, 10.0], 'OPP')
+    #One seeded game is the first game of a seeded batch
+    assert team.points(5) == team.simulate(1, rng=5)['points'][0]
+    assert team.stat(5) == team.stat(5) and 0 <= team.stat(5) <= 17
+    first = game_result(team, opponent, 'Rebounds', rng=9)
+    assert first == game_result(team, opponent, 'Rebounds', rng=9)
+    assert len(first['lines']) == 2 and first['team_stat'] is not None
+    #A generator keeps drawing new games
+    rng = np.random.default_rng(1)
+    assert len({team.points(rng) for _ in range(20)}) > 1
+
+def test_player_aggregates():
+    """Function does testing on the cached player_aggregates layer"""
+    aggregates = player_aggregates()
+    assert player_aggregates() is aggregates
+    assert list(aggregates.ranked('PTS').index[:2]) == ['hardeja01', 'bealbr01']
+    #Changing the data rebuilds the aggregates
+    original = functions.df
+    functions.df = original.copy()
+    functions.df.iloc[0, functions.df.columns.get_loc('PTS')] = 99.0
+    try:
+        assert player_aggregates() is not aggregates
+        assert top_5('PTS')[0]['Steven Adams'] == 99.0
+    finally:
+        functions.df = original
+    assert player_aggregates().key == aggregates.key
+    #Columns outside STATS are part of the key too, e.g. for top_5_weighted
+    functions.df = original.copy()
+    try:
+        copied = player_aggregates()
+        functions.df.loc[functions.df['Player'] == 'Steven Adams', 'TOV'] = 50.0
+        assert player_aggregates() is not copied
+        assert 'Steven Adams' in top_5_weighted({'TOV': 1})[0]
+    finally:
+        functions.df = original
+
+
+def test_parse_csv(tmp_path):
+    """Function does testing on the schema used by parse_csv"""
+    frame = functions.parse_csv(functions.DATA_PATH)
+    #The attribution footer is rejected instead of becoming a row of NaN
+    assert frame.attrs['rejected_rows'] == 1
+    assert frame['Rk'].notna().all() and frame['Player'].notna().all()
+    assert str(frame['Tm'].dtype) == 'category' and str(frame['Pos'].dtype) == 'category'
+    assert frame['PTS'].dtype == np.float32 and frame['G'].dtype == np.int16
+    assert frame.loc[(2020, 'adamsst01', 'OKC'), 'Player'] == 'Steven Adams'
+    raw = pd.read_csv(functions.DATA_PATH)
+    assert frame.memory_usage(deep=True, index=False).sum() < 0.6 * raw.memory_usage(deep=True).sum()
+    #Data rows without a player id are an error
+    bad = tmp_path / 'bad.csv'
+    with open(functions.DATA_PATH) as csv:
+        bad.write_text(csv.read().replace('Steven Adams\\adamsst01', 'Steven Adams'))
+    with pytest.raises(ValueError, match='Steven Adams'):
+        functions.parse_csv(str(bad))
+
+
+def test_load_data_snapshot(tmp_path):
+    """Function does testing on the binary snapshot used by load_data"""
+    source = str(tmp_path / 'players.csv')
+    shutil.copy(functions.DATA_PATH, source)
+    try:
+        #First load parses the csv and saves the snapshot
+        functions.load_data(source)
+        assert os.path.exists(source + '.cache/meta.json')
+        frame = functions.load_data(source)
+        pd.testing.assert_frame_equal(frame, functions.parse_csv(source))
+        #Stats come straight from the memory-mapped snapshot
+        values = frame['PTS'].to_numpy()
+        while not isinstance(values, np.memmap) and values.base is not None:
+            values = values.base
+        assert isinstance(values, np.memmap)
+        #Editing the csv rebuilds the snapshot
+        with open(source) as csv:
+            text = csv.read()
+        with open(source, 'w') as csv:
+            csv.write(text.replace('Steven Adams', 'Steve Adams'))
+        assert 'Steve Adams' in list(functions.load_data(source)['Player'])
+        assert 'Steve Adams' in list(functions.load_data(source)['Player'])
+    finally:
+        functions.load_data()
+
+
+def test_load_seasons(tmp_path):
+    """Function does testing on loading a directory of per season csv files"""
+    with open(functions.DATA_PATH) as csv:
+        text = csv.read()
+    (tmp_path / 'NBA_2020_per_game.csv').write_text(text)
+    #Give Steven Adams a different scoring average in 2019
+    adams = text.split('\n')[1]
+    (tmp_path / 'NBA_2019_per_game.csv').write_text(text.replace(adams, adams[:-4] + '40.9'))
+    try:
+        frame = functions.load_data(str(tmp_path))
+        assert sorted(frame['Season'].unique()) == [2019, 2020]
+        assert frame.index.is_unique
+        #Parsing in small chunks gives the same store
+        pd.testing.assert_frame_equal(functions.load_seasons(str(tmp_path), chunksize=100), frame)
+        #The second load reads the snapshot of the whole directory
+        pd.testing.assert_frame_equal(functions.load_data(str(tmp_path)), frame)
+        assert top_5('PTS', season=2019)[0]['Steven Adams'] == 40.9
+        assert top_5('PTS', 'OKC', season=(2019, 2020))[0]['Steven Adams'] == 25.9
+        assert top_5_balanced('AST', season=range(2020, 2021))[0]['LeBron James'] == [10.2, 'PG']
+        assert len(top_5_all_teams('PTS', season=2019)) == 30
+    finally:
+        functions.load_data()
+
+
+#Cumulative import time budget for headless use of the module in microseconds
+IMPORT_TIME_BUDGET = 500000
+
+def test_import_time(tmp_path):
+    """Function does testing that importing functions is headless and within budget"""
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(functions.__file__)))
+    code = ('import sys\n'
+            'from my_module import functions\n'
+            'assert "pandas" not in sys.modules and "tkinter" not in sys.modules\n'
+            'assert len(functions.df) > 600\n')
+    env = dict(os.environ, PYTHONPATH=package_dir)
+    env.pop('NBA_PLAYERS_CSV', None)
+    #Run from another directory to make sure the dataset is still found
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=tmp_path,
+                            env=env, capture_output=True, text=True, check=True)
+    cumulative = [int(line.split('|')[1]) for line in result.stderr.splitlines()
+                  if line.endswith('| my_module.functions')]
+    assert cumulative[0] < IMPORT_TIME_BUDGET
+
+def test_team_cache():
+    """Function does testing on TEAM_CACHE and warm_up"""
+    functions.TEAM_CACHE.clear()
+    assert functions.warm_up() == 160
+    assert functions.TEAM_CACHE.misses == 160 and functions.TEAM_CACHE.hits == 0
+    team = functions.make_superteam('Balanced', 'Assists')
+    assert team is functions.make_superteam('Balanced (One of Each Position)', 'Assists')
+    #Named teams share the cached roster but not the name
+    named = functions.make_superteam('Balanced', 'Assists', 'Mine')
+    assert named.team == 'Mine' and team.team == 'Superteam' and named.players == team.players
+    with pytest.raises(ValueError):
+        team.point_values[0] = 0
+    #Threads share one cache without losing counts
+    with ThreadPoolExecutor(8) as pool:
+        opponents = list(pool.map(lambda name: functions.make_opponent(name, 'Points'),
+                                  list(functions.NBA_TEAMS) * 4))
+    assert len({id(opponent) for opponent in opponents}) == 30
+    assert functions.TEAM_CACHE.hits == 3 + 120 and functions.TEAM_CACHE.misses == 160
+    assert functions.TEAM_CACHE.hit_ratio == 123 / 283
+
+
+def test_season_cache():
+    """Function does testing on SeasonCache"""
+    cache = functions.SeasonCache('test', maxsize=2)
+    assert cache.get(None, 1, lambda: 'all') == 'all'
+    assert cache.get((2019, 2019), 1, lambda: '2019') == '2019'
+    #Hits don't build again, a changed dataset key does
+    assert cache.get(None, 1, lambda: 'built again') == 'all'
+    assert cache.get(None, 2, lambda: 'new data') == 'new data'
+    #A third selection forgets the one added first
+    assert cache.get((2020, 2020), 2, lambda: '2020') == '2020' and len(cache) == 2
+    assert cache.get(None, 2, lambda: 'forgotten') == 'forgotten'
+    functions.data_changed()
+    assert len(cache) == 0
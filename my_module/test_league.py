@@ -0,0 +1,27 @@
+"""Test for my league functions."""
+
+from my_module.functions import SuperTeam, Team, top_5
+from my_module.league import ROUND_ROBIN_COLUMNS, play_matchup, round_robin
+
+
+def test_round_robin():
+    """Function does testing on round_robin function"""
+    team = SuperTeam(*top_5('PTS'))
+    table = round_robin(team, 'PTS', n_games=2000, seed=7, workers=1)
+    assert len(table) == 30
+    assert len(set(table['team'])) == 30 and 'LAL' in set(table['team'])
+    assert (table['win_prob'].diff().dropna() <= 0).all()
+    assert ((table['win_prob'] + table['tie_prob'] + table['loss_prob'] - 1).abs() < 1e-9).all()
+    #The superteam of the best scorers should beat every team most of the time
+    assert (table['win_prob'] > 0.5).all()
+    #Same seed gives the same table whether or not a process pool is used
+    assert table.equals(round_robin(team, 'PTS', n_games=2000, seed=7, workers=2))
+
+
+def test_play_matchup():
+    """Function does testing on play_matchup function"""
+    team = SuperTeam(*top_5('PTS'))
+    opponent = Team(*top_5('PTS', 'LAL'))
+    summary = play_matchup('Los Angeles Lakers', team, opponent, 2000, seed=7)
+    assert list(summary) == ROUND_ROBIN_COLUMNS and summary['team'] == 'LAL'
+    assert summary == play_matchup('Los Angeles Lakers', team, opponent, 2000, seed=7)
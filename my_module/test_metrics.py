@@ -0,0 +1,37 @@
+"""Test for my metrics functions."""
+
+import json
+
+from my_module import metrics
+from my_module.functions import SuperTeam, load_data, player_aggregates, top_5
+
+
+def test_metrics():
+    """Function does testing on get_metrics and its exports"""
+    was_enabled = metrics.ENABLED
+    metrics.reset_metrics()
+    metrics.enable(False)
+    try:
+        top_5('PTS')
+        assert metrics.get_metrics()['timers'] == {}
+        metrics.enable()
+        team = SuperTeam(*top_5('PTS'))
+        team.points()
+        team.simulate(100, rng=1)
+        player_aggregates()
+        load_data(snapshot=False)
+        with metrics.timer('block'):
+            metrics.count('things', 2)
+        result = metrics.get_metrics()
+    finally:
+        metrics.enable(was_enabled)
+        load_data()
+    assert result['timers']['top_5']['count'] == 1
+    assert result['timers']['parse_csv']['count'] == 1
+    assert result['timers']['team_points']['total'] >= result['timers']['team_points']['max'] > 0
+    assert set(result['timers']) >= {'team_simulate', 'block'}
+    assert result['counters']['aggregates_cache_hit'] >= 2 and result['counters']['things'] == 2
+    assert json.loads(metrics.metrics_json())['counters']['things'] == 2
+    text = metrics.metrics_prometheus()
+    assert 'nba_stage_seconds_count{stage="top_5"} 1\n' in text
+    assert 'nba_events_total{event="things"} 2\n' in text
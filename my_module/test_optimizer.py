@@ -0,0 +1,59 @@
+"""Test for my optimizer functions."""
+
+from my_module import functions
+from my_module.functions import POSITIONS, Team, top_5, top_5_balanced
+from my_module.optimizer import optimize_lineup
+
+
+def test_optimize_lineup():
+    """Function does testing on optimize_lineup function"""
+    #A single stat total is met by the top 5 scorers, as top_5() picks them
+    result = optimize_lineup()
+    assert result['complete'] and result['gap'] == 0
+    assert result['team'].players == top_5('PTS')[0]
+    assert round(result['value'], 1) == round(sum(top_5('PTS')[1]), 1)
+    result = optimize_lineup(balanced=True)
+    assert result['team'].players == top_5_balanced('PTS')[0]
+
+    #Beating an opponent in points and rebounds takes some big men
+    opponent = Team(*top_5('TRB', 'LAL'))
+    result = optimize_lineup(opponent=opponent, stat='TRB', balanced=True)
+    assert result['complete'] and result['nodes'] > 1
+    assert sorted(pos for _, pos in result['team'].players.values()) == \
+        ['C', 'PF', 'PG', 'SF', 'SG']
+    assert 0.99 < result['value'] <= 1
+    greedy = optimize_lineup(opponent=opponent, stat='TRB', balanced=True, node_budget=0)
+    assert not greedy['complete'] and greedy['value'] < result['value'] <= greedy['bound']
+    assert greedy['gap'] == greedy['bound'] - greedy['value']
+
+
+def test_optimize_lineup_other_positions():
+    """Function does testing on balanced lineups when players have other positions"""
+    original = functions.df
+    functions.df = original.copy()
+    pos = functions.df['Pos'].cat.add_categories(['F'])
+    pos[functions.df['Player'] == 'James Harden'] = 'F'
+    functions.df['Pos'] = pos
+    try:
+        opponent = Team(*top_5('TRB', 'LAL'))
+        result = optimize_lineup(opponent=opponent, stat='TRB', balanced=True)
+        #A player listed as 'F' can't fill any of the five positions
+        assert 'James Harden' not in result['team'].players
+        assert sorted(pos for _, pos in result['team'].players.values()) == sorted(POSITIONS)
+    finally:
+        functions.df = original
+
+
+def test_optimize_lineup_same_name():
+    """Function does testing on lineups of players who share a name"""
+    original = functions.df
+    functions.df = original.copy()
+    functions.df.loc[functions.df['Player'] == 'Bradley Beal', 'Player'] = 'James Harden'
+    try:
+        result = optimize_lineup()
+        #Both James Hardens are kept apart by their 'Name\\playerid' labels
+        assert result['team'].players == top_5('PTS')[0]
+        assert 'James Harden\\bealbr01' in result['team'].players
+        assert len(result['team'].names) == len(result['team'].point_values) == 5
+    finally:
+        functions.df = original
@@ -0,0 +1,55 @@
+"""Test for my possession functions."""
+
+import numpy as np
+import pytest
+
+from my_module import functions
+from my_module.functions import SuperTeam, Team, make_superteam, top_5
+from my_module.roster import make_custom_team, player_index
+from my_module.possession import possession_model, simulate_possessions
+
+
+def test_simulate_possessions():
+    """Function does testing on simulate_possessions and Team.simulate with model='possession'"""
+    team = SuperTeam(*top_5('PTS'))
+    games = simulate_possessions(team, 50000, rng=2)
+    assert games['player_points'].shape == (50000, 5)
+    #Box score identities hold in every game
+    assert (games['points'] == games['player_points'].sum(axis=1)).all()
+    assert (games['points'] == 2 * (games['FGM'] - games['3PM']) + 3 * games['3PM'] +
+            games['FTM']).all()
+    assert (2 * games['possessions'] == 2 * games['FGA'] + games['FTA'] + 2 * games['TOV']).all()
+    assert (games['FGM'] <= games['FGA']).all() and (games['FTM'] <= games['FTA']).all()
+    #On average players score their points per game
+    model = possession_model()
+    assert np.allclose(games['player_points'].mean(axis=0), team.point, atol=0.3)
+    assert (simulate_possessions(team, 10, rng=1)['points'] ==
+            simulate_possessions(team, 10, rng=1)['points']).all()
+
+    opponent = Team(*top_5('PTS', 'LAL'))
+    results = team.simulate(20000, opponent, rng=3, model='possession')
+    assert abs(results['mean_points'] - sum(team.point)) < 1
+    assert results['win_prob'] > 0.5 and len(results['opponent_stats']) == 20000
+    assert model is possession_model()
+    with pytest.raises(ValueError):
+        team.simulate(10, model='coin flip')
+
+
+def test_simulate_possessions_by_id():
+    """Function does testing on simulate_possessions finding players by id and season"""
+    team = make_superteam('Unbalanced', 'Points', season=2020)
+    assert team.season == (2020, 2020) and len(team.player_ids) == 5
+    original = functions.df
+    functions.df = original.copy()
+    functions.df.loc[functions.df['Player'] == 'Luka Dončić', 'Player'] = 'Nikola Jokić'
+    try:
+        index = player_index()
+        twins = sorted(index.find('Nikola Jokic'))
+        names = [index.label(plyr) for plyr in twins] + ['LeBron James', 'Giannis', 'Stephen Curry']
+        picked = make_custom_team(names, 'Points')
+        assert list(picked.player_ids[:2]) == twins
+        #Each player named Nikola Jokić scores their own points per game
+        games = simulate_possessions(picked, 40000, rng=6)
+        assert np.allclose(games['player_points'].mean(axis=0), picked.point, atol=0.3)
+    finally:
+        functions.df = original
@@ -0,0 +1,77 @@
+"""Test for my roster functions."""
+
+import time
+
+import pytest
+
+from my_module import functions
+from my_module.functions import STAT_NAMES, SuperTeam, player_aggregates
+from my_module.roster import PlayerIndex, fold_name, make_custom_team, pick_players, player_index
+
+
+def test_player_index():
+    """Function does testing on fold_name and the PlayerIndex class"""
+    assert fold_name(' Nikola  JOKIĆ ') == 'nikola jokic'
+    assert fold_name('Ersan İlyasova') == 'ersan ilyasova'
+    index = player_index()
+    jokic = index.resolve('Nikola Jokić')
+    #Accents, capitals, prefixes of any word and ids find the same player
+    for query in ('Nikola Jokic', 'nikola jokic', 'Jokic', 'Nikola Jok', jokic,
+                  'Wrong Name\\' + jokic):
+        assert index.resolve(query) == jokic
+    assert index.label(jokic) == 'Nikola Jokić\\' + jokic
+    with pytest.raises(ValueError):
+        index.resolve('Bogdanovic')
+    with pytest.raises(KeyError, match='Nikola Jokić'):
+        index.resolve('Nikola Jokix')
+    assert index.find('') == [] and index.find('zzzz') == []
+    #Players with the same name are found together, then picked by id
+    aggregates = player_aggregates()
+    twin = aggregates.means.index[0]
+    aggregates.names[twin], original = 'Nikola Jokić', aggregates.names[twin]
+    try:
+        shared = PlayerIndex(aggregates)
+        assert sorted(shared.find('Nikola Jokic')) == sorted([twin, jokic])
+        assert shared.resolve('Nikola Jokić\\' + twin) == twin
+    finally:
+        aggregates.names[twin] = original
+    start = time.perf_counter()
+    for _ in range(1000):
+        index.find('Giannis')
+    assert time.perf_counter() - start < 1
+
+
+def test_make_custom_team():
+    """Function does testing on pick_players and make_custom_team functions"""
+    names = ['Jokic', 'Luka Doncic', 'LeBron James', 'Giannis', 'Stephen Curry']
+    players, points = pick_players(names, STAT_NAMES['Assists'])
+    assert len(players) == 5 and 'Luka Dončić' in players
+    assert players['LeBron James'] > 5 and points[2] > 20
+    team = make_custom_team(names, 'Assists', 'Picked')
+    assert isinstance(team, SuperTeam) and team.team == 'Picked'
+    assert team.players == players and make_custom_team(names, 'Assists') is \
+        make_custom_team(['Nikola Jokić'] + names[1:], 'Assists')
+    with pytest.raises(ValueError):
+        pick_players(names[:4], 'PTS')
+    with pytest.raises(ValueError):
+        pick_players(names[:4] + ['Nikola Jokić'], 'PTS')
+
+
+def test_pick_players_same_name():
+    """Function does testing on pick_players when picked players share a name"""
+    original = functions.df
+    functions.df = original.copy()
+    twin = functions.df['Player'] == 'Luka Dončić'
+    functions.df.loc[twin, 'Player'] = 'Nikola Jokić'
+    try:
+        index = player_index()
+        ids = sorted(index.find('Nikola Jokic'))
+        names = [index.label(plyr) for plyr in ids] + ['LeBron James', 'Giannis', 'Stephen Curry']
+        players, points = pick_players(names, 'PTS')
+        #Both players keep their own entry and stat
+        assert list(players)[:2] == names[:2] and len(players) == len(points) == 5
+        assert list(players.values())[:2] == points[:2] and points[0] != points[1]
+        team = SuperTeam(players, points)
+        assert len(team.names) == len(team.point_values) == 5
+    finally:
+        functions.df = original
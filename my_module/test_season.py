@@ -0,0 +1,44 @@
+"""Test for my season functions."""
+
+import numpy as np
+import pytest
+
+from my_module.functions import SuperTeam, all_opponents, top_5
+from my_module.distribution import matchup_distribution
+from my_module.season import season_schedule, series_matrix, simulate_seasons, win_matrix
+
+
+def test_win_matrix():
+    """Function does testing on win_matrix, series_matrix and season_schedule functions"""
+    teams = list(all_opponents('PTS').values())[:4]
+    matrix = win_matrix(teams)
+    game = matchup_distribution(teams[0], teams[1])
+    assert matrix[0, 1] == pytest.approx(game['win_prob'] + game['tie_prob'] / 2)
+    assert np.allclose(matrix + matrix.T, 1)
+    simulated = win_matrix(teams, 'possession', n_games=4000, rng=1)
+    assert np.allclose(simulated + simulated.T, 1) and simulated.shape == (4, 4)
+    #Better teams are likelier to take a series than a single game
+    series = series_matrix(np.array([[0.5, 0.6], [0.4, 0.5]]))
+    assert series[0, 0] == pytest.approx(0.5) and series[0, 1] == pytest.approx(0.710208)
+    schedule = season_schedule(31)
+    assert (schedule.sum(axis=1) == 82).all() and (schedule == schedule.T).all()
+    assert (season_schedule(30).sum(axis=1) == 82).all()
+    with pytest.raises(ValueError):
+        season_schedule(31, 81)
+
+
+def test_simulate_seasons():
+    """Function does testing on simulate_seasons function"""
+    team = SuperTeam(*top_5('PTS'), 'Stars')
+    table = simulate_seasons(team, 'PTS', n_seasons=3000, seed=4, conference='East')
+    assert len(table) == 31 and table['name'].iloc[0] == 'Stars'
+    assert table['conference'].iloc[0] == 'East' and table['title_prob'].iloc[0] > 0.9
+    assert table['mean_wins'].sum() == pytest.approx(31 * 41)
+    #16 teams make the playoffs, 2 the finals and 1 wins the title every season
+    assert table['playoff_prob'].sum() == pytest.approx(16)
+    assert table['finals_prob'].sum() == pytest.approx(2)
+    assert table['title_prob'].sum() == pytest.approx(1)
+    assert (table['playoff_prob'] >= table['title_prob']).all()
+    assert table.equals(simulate_seasons(team, 'PTS', n_seasons=3000, seed=4, conference='East'))
+    with pytest.raises(ValueError):
+        simulate_seasons(team, 'PTS', conference='North')
@@ -0,0 +1,104 @@
+"""Test for my service functions."""
+
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from my_module.service import SuperteamService, serve
+
+
+async def _request(host, port, method, path, body=None):
+    """Send one request on a new connection and return its status and JSON"""
+    reader, writer = await asyncio.open_connection(host, port)
+    data = json.dumps(body).encode() if body is not None else b''
+    writer.write((method + ' ' + path + ' HTTP/1.1\r\nHost: test\r\nConnection: close\r\n'
+                  'Content-Length: ' + str(len(data)) + '\r\n\r\n').encode() + data)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(payload)
+
+
+async def _client(host, port, stat, team):
+    """Build a team and opponent in a new session, then play and simulate"""
+    status, payload = await _request(host, port, 'POST', '/sessions')
+    assert status == 201
+    path = '/sessions/' + payload['session']
+    status, made = await _request(host, port, 'POST', path + '/team',
+                                  {'bal': 'Unbalanced', 'stat': stat})
+    assert status == 200
+    status, _ = await _request(host, port, 'POST', path + '/opponent', {'team': team})
+    assert status == 200
+    status, game = await _request(host, port, 'POST', path + '/game')
+    assert status == 200 and len(game['lines']) == (1 if stat == 'Points' else 2)
+    status, sims = await _request(host, port, 'POST', path + '/simulate',
+                                  {'n_games': 500, 'seed': 3})
+    assert status == 200 and sims['results'][0]['team'] == 'LAL'
+    return made['message'], sims['results'][0]
+
+
+def test_service():
+    """Function does testing on the JSON service"""
+    async def run():
+        ready = asyncio.get_running_loop().create_future()
+        with ThreadPoolExecutor(4) as executor:
+            server = asyncio.ensure_future(serve('127.0.0.1', 0, executor, ready))
+            host, port = await ready
+            clients = [_client(host, port, stat, 'Los Angeles Lakers')
+                       for stat in ('Points', 'Rebounds') * 20]
+            results = await asyncio.gather(*clients)
+            #Missing sessions, steps and stats are errors instead of crashes
+            assert (await _request(host, port, 'POST', '/sessions/nope/game'))[0] == 404
+            session = (await _request(host, port, 'POST', '/sessions'))[1]['session']
+            assert (await _request(host, port, 'POST', '/sessions/' + session + '/game'))[0] \
+                == 409
+            assert (await _request(host, port, 'POST', '/sessions/' + session + '/team',
+                                   {'stat': 'Dunks'}))[0] == 400
+            status, made = await _request(host, port, 'POST', '/sessions/' + session + '/team',
+                                          {'stat': 'Points', 'players': ['Jokic', 'Luka Doncic',
+                                           'LeBron James', 'Giannis', 'Stephen Curry']})
+            assert status == 200 and 'Nikola Jokić' in made['players']
+            assert (await _request(host, port, 'POST', '/sessions/' + session + '/team',
+                                   {'stat': 'Points', 'players': ['Nobody']}))[0] == 400
+            assert (await _request(host, port, 'POST', '/sessions/' + session + '/team',
+                                   {'stat': 'Points', 'players': [1, 2, 3, 4, 5]}))[0] == 400
+            server.cancel()
+        return results
+
+    results = asyncio.run(run())
+    #Concurrent sessions keep their own teams and same seeds match
+    assert {message for message, _ in results[0::2]} == {results[0][0]}
+    assert {message for message, _ in results[1::2]} == {results[1][0]}
+    assert 'Rebounds' in results[1][0] and results[0][0] != results[1][0]
+    assert all(row == results[0][1] for _, row in results[0::2])
+
+
+def test_service_internal_error():
+    """Function does testing on unexpected errors in the JSON service"""
+    class Broken(SuperteamService):
+        async def _route(self, method, parts, body):
+            raise AttributeError('boom')
+
+    with ThreadPoolExecutor(1) as executor:
+        status, payload = asyncio.run(Broken(executor).handle('GET', '/metrics', {}))
+    assert status == 500 and 'AttributeError' in payload['error']
+
+
+def test_service_bad_input():
+    """Function does testing on invalid request bodies in the JSON service"""
+    async def run():
+        service = SuperteamService(executor)
+        session = (await service.handle('POST', '/sessions', {}))[1]['session']
+        path = '/sessions/' + session
+        #Team types are matched exactly, not as part of 'Balanced (One of Each Position)'
+        for bal in ('', 'Bal', 'an', ['Balanced']):
+            assert (await service.handle('POST', path + '/team',
+                                         {'stat': 'Points', 'bal': bal}))[0] == 400
+        assert (await service.handle('POST', path + '/team', {'stat': 'Points'}))[0] == 200
+        #n_games that isn't a whole number in range is a bad request, not a crash
+        return [(await service.handle('POST', path + '/simulate', {'n_games': n_games}))[0]
+                for n_games in (float('inf'), 1e999, 500.0, [500], {}, True, '500', 0)]
+
+    with ThreadPoolExecutor(1) as executor:
+        assert asyncio.run(run()) == [400] * 8